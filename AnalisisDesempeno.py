@@ -1,22 +1,92 @@
-import matplotlib.pyplot as plt
-import numpy as np
+import os
 import statistics
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from reporting import draw_performance
+from solvers import sembrar, iniciar_worker, worker_state
+from checkpoint import check_parallel_path
+
+
+def _ejecutar_repeticion(indice, semilla, guardar_historial):
+    solver = worker_state["solver"]
+    sembrar(solver, semilla)
+    _, valor, iter_conv, tiempo = solver.run()
+    historial = solver.fitness_history if guardar_historial else None
+    return indice, valor, tiempo, iter_conv, historial
+
+
+def ejecutar_en_paralelo(solver, n=30, procesos=None, semilla=None):
+    """
+    Ejecuta n repeticiones de solver.run() en un pool de procesos.
+    Los datos del problema se envían una vez por proceso y la repetición i usa la semilla semilla + i;
+    sin semilla se toma entropía nueva del sistema, así que cada estudio es distinto (como en serie).
+    Devuelve (valores, tiempos, iteraciones) en el orden de las repeticiones y deja en
+    solver.fitness_history el historial de la última.
+    """
+    check_parallel_path(solver)
+    if semilla is None:
+        semilla = np.random.SeedSequence().entropy
+    procesos = min(procesos or os.cpu_count() or 1, n)
+    valores = [None] * n
+    tiempos = [None] * n
+    iteraciones = [None] * n
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=iniciar_worker,
+                             initargs=({"solver": solver},)) as pool:
+        futuros = [pool.submit(_ejecutar_repeticion, i, semilla + i, i == n - 1) for i in range(n)]
+        for terminadas, futuro in enumerate(as_completed(futuros)):
+            if terminadas % 5 == 0:
+                print(f"Progreso: {terminadas}/{n}")
+            i, valor, tiempo, iter_conv, historial = futuro.result()
+            valores[i] = valor
+            tiempos[i] = tiempo
+            iteraciones[i] = iter_conv
+            if historial is not None:
+                solver.fitness_history = historial
+
+    return valores, tiempos, iteraciones
+
+
+def brecha_optimalidad(valor, optimo):
+    """Brecha relativa (%) entre un valor encontrado y el óptimo exacto."""
+    if not optimo:
+        return 0.0
+    return 100.0 * (optimo - valor) / optimo
 
-def ejecutar_varias_veces_sa(sa, n=30):
-    """Ejecuta el algoritmo de enfriamiento simulado varias veces y muestra estadísticas con gráfico."""
+
+def mostrar_desempeno(ruta, historial, valores, titulo, estilo, etiqueta_y):
+    """Dibuja, guarda y muestra la figura de desempeño en la ventana interactiva."""
+    import matplotlib.pyplot as plt
+    iteraciones, valores_historial = historial.points()
+    draw_performance(plt, iteraciones, valores_historial, valores, titulo, estilo, etiqueta_y)
+    plt.savefig(ruta)
+    plt.show()
+
+
+def ejecutar_varias_veces_sa(sa, n=30, procesos=1, semilla=None, optimo=None, reporte=None):
+    """
+    Ejecuta el algoritmo de enfriamiento simulado varias veces y muestra estadísticas con gráfico.
+    Con procesos > 1 (o None para usar todos los núcleos) las repeticiones corren en paralelo.
+    Si se indica el óptimo exacto (p. ej. de KnapsackDynamicProgramming) se muestra la brecha media.
+    Con reporte (reporting.StudyReport) la figura se agrega al reporte en lugar de mostrarse.
+    """
     valores = []
     tiempos = []
     iteraciones = []
 
     print(f"Ejecutando SA {n} veces...")
-    for i in range(n):
-        if i % 5 == 0:
-            print(f"Progreso: {i}/{n}")
-        sa.generate_initial_solution()
-        _, valor, iter_conv, tiempo = sa.run()
-        valores.append(valor)
-        tiempos.append(tiempo)
-        iteraciones.append(iter_conv)
+    if procesos != 1:
+        valores, tiempos, iteraciones = ejecutar_en_paralelo(sa, n, procesos, semilla)
+    else:
+        for i in range(n):
+            if i % 5 == 0:
+                print(f"Progreso: {i}/{n}")
+            sa.generate_initial_solution()
+            sembrar(sa, None if semilla is None else semilla + i)
+            _, valor, iter_conv, tiempo = sa.run()
+            valores.append(valor)
+            tiempos.append(tiempo)
+            iteraciones.append(iter_conv)
 
     # Cálculo de estadísticas
     promedio = statistics.mean(valores)
@@ -24,29 +94,13 @@ def ejecutar_varias_veces_sa(sa, n=30):
     maximo = max(valores)
     varianza = statistics.variance(valores)
 
-    # Crear figura con dos subplots
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-
-    # Gráfico de convergencia de la última ejecución
-    ax1.plot(sa.fitness_history, 'b-')
-    ax1.set_title('Convergencia de Enfriamiento Simulado')
-    ax1.set_xlabel('Iteración')
-    ax1.set_ylabel('Valor de la mochila')
-    ax1.grid(True)
-
-    # Gráfico de barras para todas las ejecuciones
-    x = np.arange(len(valores))
-    ax2.bar(x, valores, color='blue', alpha=0.7)
-    ax2.axhline(y=promedio, color='r', linestyle='-', label=f'Promedio: {promedio:.2f}')
-    ax2.set_title(f'Desempeño en {n} ejecuciones')
-    ax2.set_xlabel('Ejecuciones')
-    ax2.set_ylabel('Costo Total')
-    ax2.legend()
-    ax2.grid(True, axis='y')
-
-    plt.tight_layout()
-    plt.savefig(f'desempeno_sa_{n}_ejecuciones.png')
-    plt.show()
+    # Gráfico: en el reporte del estudio si se indicó, si no se muestra ahora
+    titulo = 'Convergencia de Enfriamiento Simulado'
+    ruta = f'desempeno_sa_{n}_ejecuciones.png'
+    if reporte is not None:
+        reporte.add_performance(ruta, sa.fitness_history, valores, titulo, 'b-')
+    else:
+        mostrar_desempeno(ruta, sa.fitness_history, valores, titulo, 'b-', 'Valor de la mochila')
 
     # Resumen estadístico
     print("\n--- Estadísticas después de varias ejecuciones SA ---")
@@ -58,24 +112,36 @@ def ejecutar_varias_veces_sa(sa, n=30):
     print(f"Promedio tiempo (s): {statistics.mean(tiempos):.4f} ± {statistics.stdev(tiempos):.4f}")
     print(
         f"Promedio iteraciones de convergencia: {statistics.mean(iteraciones):.2f} ± {statistics.stdev(iteraciones):.2f}")
+    if optimo is not None:
+        brechas = [brecha_optimalidad(v, optimo) for v in valores]
+        print(f"Brecha al óptimo ({optimo:.2f}): {statistics.mean(brechas):.2f}% ± {statistics.stdev(brechas):.2f}%")
 
     return valores, tiempos, iteraciones
 
 
-def ejecutar_varias_veces_aco(aco, n=30):
-    """Ejecuta el algoritmo de colonia de hormigas varias veces y muestra estadísticas con gráfico."""
+def ejecutar_varias_veces_aco(aco, n=30, procesos=1, semilla=None, optimo=None, reporte=None):
+    """
+    Ejecuta el algoritmo de colonia de hormigas varias veces y muestra estadísticas con gráfico.
+    Con procesos > 1 (o None para usar todos los núcleos) las repeticiones corren en paralelo.
+    Si se indica el óptimo exacto (p. ej. de KnapsackDynamicProgramming) se muestra la brecha media.
+    Con reporte (reporting.StudyReport) la figura se agrega al reporte en lugar de mostrarse.
+    """
     vals = []
     times = []
     iters = []
 
     print(f"Ejecutando ACO {n} veces...")
-    for i in range(n):
-        if i % 5 == 0:
-            print(f"Progreso: {i}/{n}")
-        _, v, itc, t = aco.run()
-        vals.append(v)
-        times.append(t)
-        iters.append(itc)
+    if procesos != 1:
+        vals, times, iters = ejecutar_en_paralelo(aco, n, procesos, semilla)
+    else:
+        for i in range(n):
+            if i % 5 == 0:
+                print(f"Progreso: {i}/{n}")
+            sembrar(aco, None if semilla is None else semilla + i)
+            _, v, itc, t = aco.run()
+            vals.append(v)
+            times.append(t)
+            iters.append(itc)
 
     # Cálculo de estadísticas
     promedio = statistics.mean(vals)
@@ -83,29 +149,13 @@ def ejecutar_varias_veces_aco(aco, n=30):
     maximo = max(vals)
     varianza = statistics.variance(vals)
 
-    # Crear figura con dos subplots
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-
-    # Gráfico de convergencia de la última ejecución
-    ax1.plot(aco.fitness_history, 'r-')
-    ax1.set_title('Convergencia Colonia de Hormigas')
-    ax1.set_xlabel('Iteración')
-    ax1.set_ylabel('Valor mochila')
-    ax1.grid(True)
-
-    # Gráfico de barras para todas las ejecuciones
-    x = np.arange(len(vals))
-    ax2.bar(x, vals, color='blue', alpha=0.7)
-    ax2.axhline(y=promedio, color='r', linestyle='-', label=f'Promedio: {promedio:.2f}')
-    ax2.set_title(f'Desempeño en {n} ejecuciones')
-    ax2.set_xlabel('Ejecuciones')
-    ax2.set_ylabel('Costo Total')
-    ax2.legend()
-    ax2.grid(True, axis='y')
-
-    plt.tight_layout()
-    plt.savefig(f'desempeno_aco_{n}_ejecuciones.png')
-    plt.show()
+    # Gráfico: en el reporte del estudio si se indicó, si no se muestra ahora
+    titulo = 'Convergencia Colonia de Hormigas'
+    ruta = f'desempeno_aco_{n}_ejecuciones.png'
+    if reporte is not None:
+        reporte.add_performance(ruta, aco.fitness_history, vals, titulo, 'r-', 'Valor mochila')
+    else:
+        mostrar_desempeno(ruta, aco.fitness_history, vals, titulo, 'r-', 'Valor mochila')
 
     # Mostrar resumen estadístico
     print("\n--- Estadísticas después de varias ejecuciones ACO ---")
@@ -116,5 +166,8 @@ def ejecutar_varias_veces_aco(aco, n=30):
     print(f"Varianza: {varianza:.2f}")
     print(f"Tiempo promedio: {statistics.mean(times):.4f}s ± {statistics.stdev(times):.4f}s")
     print(f"Iter. convergencia: {statistics.mean(iters):.2f} ± {statistics.stdev(iters):.2f}")
+    if optimo is not None:
+        brechas = [brecha_optimalidad(v, optimo) for v in vals]
+        print(f"Brecha al óptimo ({optimo:.2f}): {statistics.mean(brechas):.2f}% ± {statistics.stdev(brechas):.2f}%")
 
     return vals, times, iters
\ No newline at end of file
@@ -1,13 +1,34 @@
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-import random
 import time
 import statistics
+from bisect import bisect_left
+from random_stream import RandomStream
+from telemetry import ConvergenceTrace
+from evaluation_cache import EvaluationCache
+from problem import KnapsackProblem
+from checkpoint import checkpoint_file, load_checkpoint, save_solver_state, restore_solver_state
 
 class KnapsackAntColony:
-    def __init__(self, ant_count=50, max_iterations=200, alpha=1.0, beta=2.0, evaporation_rate=0.5, q=100):
+    def __init__(self, ant_count=50, max_iterations=200, alpha=1.0, beta=2.0, evaporation_rate=0.5, q=100,
+                 vectorized=False, seed=None, instrumentation=None, stopping=None, history_size=2048,
+                 telemetry=None, local_search=None, cache_size=0, checkpoint_path=None, checkpoint_every=50):
         """
         Inicializa el algoritmo de colonias de hormigas.
+        Con vectorized=True cada iteración construye toda la colonia a la vez con NumPy.
+        seed puede ser un entero o un numpy.random.Generator para ejecuciones reproducibles.
+        instrumentation (instrumentation.Instrumentation) activa contadores y temporizadores.
+        stopping (stopping.StoppingCriteria) añade criterios de parada anticipada.
+        history_size acota los puntos de fitness_history; telemetry (telemetry.TelemetryWriter)
+        guarda la traza completa de cada ejecución en disco.
+        local_search (local_search.LocalSearch) mejora las top_k mejores hormigas de cada
+        iteración antes de actualizar las feromonas.
+        cache_size > 0 guarda (valor, peso) de hasta esa cantidad de soluciones distintas
+        (evaluation_cache.EvaluationCache, LRU) entre hormigas, iteraciones y ejecuciones;
+        aplica al modo no vectorizado, donde cada hormiga se evalúa por separado.
+        Con checkpoint_path el estado (feromonas, mejor solución, iteración, generador) se guarda
+        cada checkpoint_every iteraciones y al terminar; run(resume=True) continúa desde él.
+        La ruta puede contener {pid} y {seed} (la semilla de set_seed) para un archivo por ejecución.
         """
         self.ant_count = ant_count
         self.max_iterations = max_iterations
@@ -15,6 +36,18 @@ class KnapsackAntColony:
         self.beta = beta
         self.evaporation_rate = evaporation_rate
         self.q = q
+        self.vectorized = vectorized
+        self.seed = seed
+        self.rng = RandomStream(seed)
+        self.instrumentation = instrumentation
+        self.stopping = stopping
+        self.history_size = history_size
+        self.telemetry = telemetry
+        self.local_search = local_search
+        self.cache_size = cache_size
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.evaluation_cache = None
 
         # Datos del problema
         self.weights = []
@@ -22,161 +55,378 @@ class KnapsackAntColony:
         self.quantities = []
         self.max_weight = 0
         self.n_items = 0
+        self.problem = None
+        self.weight_array = None
+        self.value_array = None
+        self.quantity_array = None
 
         # Feromonas e información heurística
         self.pheromone = None
         self.heuristic = None
+        self.cumulative = None
+        self.cumulative_rows = None
+        self.table_iteration = None
 
         # Seguimiento
         self.iterations = 0
         self.convergence_iter = 0
         self.best_solution = None
         self.best_value = 0
-        self.fitness_history = []
+        self.fitness_history = ConvergenceTrace(history_size)
         self.time_elapsed = 0
+        self.stop_reason = None
 
     def set_problem_data(self, data):
         """
-        Establece los datos del problema desde un diccionario.
+        Establece los datos del problema desde un diccionario o un KnapsackProblem.
+        Si data trae "compiled" (catalog.Catalog.instance) se reutilizan sus arreglos y tablas.
         """
+        self.problem = KnapsackProblem.from_data(data)
+        if isinstance(data, KnapsackProblem):
+            data = data.to_data()
         self.weights = data["weights"]
         self.values = data["values"]
         self.quantities = data["quantities"]
         self.max_weight = data["max_weight"]
         self.n_items = data["n_items"]
+        self.table_iteration = None
+        self.evaluation_cache = EvaluationCache(self.problem.evaluate, self.cache_size) if self.cache_size else None
 
-        # Inicializa feromonas e heurística
-        max_q = [q + 1 for q in self.quantities]
-        self.pheromone = [np.ones(mq) * 0.1 for mq in max_q]
+        compiled = data.get("compiled")
+        if compiled:
+            self.weight_array = compiled["weight_array"]
+            self.value_array = compiled["value_array"]
+            self.quantity_array = compiled["quantity_array"]
+            self.valid_mask = compiled["valid_mask"]
+            self.heuristic = compiled["heuristic"]
+            self.pheromone = np.where(self.valid_mask, 0.1, 0.0)
+            if self.local_search:
+                self.local_search.setup(data)
+            return True
 
-        self.heuristic = []
-        for i in range(self.n_items):
-            item_h = []
-            for k in range(self.quantities[i] + 1):
-                item_h.append((k * self.values[i]) / (k * self.weights[i]) if k > 0 else 0.01)
-            self.heuristic.append(item_h)
+        self.weight_array = self.problem.weights
+        self.value_array = self.problem.values
+        self.quantity_array = self.problem.quantities
+
+        # Inicializa feromonas e heurística como matrices (n_items, max_qty+1);
+        # las columnas k > quantities[i] son relleno con valor 0 y nunca se eligen
+        width = int(self.quantity_array.max()) + 1 if self.n_items else 1
+        ks = np.arange(width)
+        self.valid_mask = ks[None, :] <= self.quantity_array[:, None]
+
+        self.pheromone = np.where(self.valid_mask, 0.1, 0.0)
+
+        ratio = self.value_array / self.weight_array
+        self.heuristic = np.where(self.valid_mask, ratio[:, None], 0.0)
+        self.heuristic[:, 0] = 0.01
+
+        if self.local_search:
+            self.local_search.setup(data)
 
         return True
 
-    def generate_ant_solution(self, iteration):
+    def set_seed(self, seed):
+        """Reinicia la fuente aleatoria; las ejecuciones siguientes son reproducibles."""
+        self.seed = seed
+        self.rng = RandomStream(seed)
+
+    def build_probability_tables(self, iteration):
         """
-        Genera una solución para una hormiga con exploración/explotación dinámica.
+        Calcula una vez por iteración el atractivo tau^alpha * eta^beta de cada (ítem, cantidad)
+        y sus sumas acumuladas por ítem. Las tablas se reutilizan para todas las hormigas
+        hasta que cambia la iteración o se actualizan las feromonas.
         """
+        if self.table_iteration == iteration:
+            return self.cumulative
+
         # Calcula factor de exploración: alto al inicio, bajo al final
         exploration = 1 - (iteration / self.max_iterations)
         dynamic_alpha = self.alpha * (1 - 0.5 * exploration)
         dynamic_beta = self.beta * (1 + 0.3 * exploration)
 
+        attractiveness = (self.pheromone ** dynamic_alpha) * (self.heuristic ** dynamic_beta)
+        self.cumulative = np.cumsum(attractiveness, axis=1)
+        # Copia en listas para las búsquedas binarias del modo no vectorizado
+        self.cumulative_rows = self.cumulative.tolist()
+        self.table_iteration = iteration
+        return self.cumulative
+
+    def generate_ant_solution(self, iteration):
+        """
+        Genera una solución para una hormiga con exploración/explotación dinámica.
+        Cada elección es una búsqueda binaria en el prefijo factible de la tabla acumulada.
+        """
+        self.build_probability_tables(iteration)
+        cumulative = self.cumulative_rows
+
         solution = [0] * self.n_items
         remaining = self.max_weight
-        order = list(range(self.n_items))
-        random.shuffle(order)
+        order = self.rng.permutation(self.n_items)
 
         for i in order:
             max_qty = min(self.quantities[i], int(remaining / self.weights[i]))
             if max_qty <= 0:
                 continue
 
-            probs = []
-            total = 0
-            for k in range(max_qty + 1):
-                p = (self.pheromone[i][k] ** dynamic_alpha) * (self.heuristic[i][k] ** dynamic_beta)
-                probs.append(p)
-                total += p
-
-            if total > 0:
-                probs = [p / total for p in probs]
-            else:
-                probs = [1.0 / (max_qty + 1)] * (max_qty + 1)
-
-            r = random.random()
-            acc = 0
-            for k, p in enumerate(probs):
-                acc += p
-                if acc >= r:
-                    solution[i] = k
-                    break
+            # Ruleta sobre k = 0..max_qty: primer k cuya suma acumulada alcanza r * total
+            row = cumulative[i]
+            r = self.rng.random() * row[max_qty]
+            solution[i] = min(bisect_left(row, r, 0, max_qty + 1), max_qty)
 
             remaining -= solution[i] * self.weights[i]
 
         return solution
 
+    def generate_colony_solutions(self, iteration):
+        """
+        Genera las soluciones de todas las hormigas de una iteración a la vez.
+        Devuelve la matriz (ant_count, n_items) de cantidades y el valor de cada hormiga.
+        """
+        cumulative = self.build_probability_tables(iteration)
+
+        ants = np.arange(self.ant_count)
+        width = cumulative.shape[1]
+        solutions = np.zeros((self.ant_count, self.n_items), dtype=int)
+        remaining = np.full(self.ant_count, float(self.max_weight))
+        # Orden aleatorio de ítems independiente para cada hormiga
+        orders = np.argsort(self.rng.generator.random((self.ant_count, self.n_items)), axis=1)
+
+        for step in range(self.n_items):
+            items = orders[:, step]
+            item_w = self.weight_array[items]
+            max_qty = np.minimum(self.quantity_array[items], np.floor(remaining / item_w).astype(int))
+            active = max_qty > 0
+            if not active.any():
+                continue
+
+            cum = cumulative[items]
+            total = cum[ants, np.maximum(max_qty, 0)]
+            # Ruleta: normaliza cada fila por el total de su prefijo factible y desplaza por fila
+            # para resolver todas las hormigas con un único searchsorted
+            cum = np.minimum(cum / np.where(total > 0, total, 1.0)[:, None], 1.0) + ants[:, None]
+            r = self.rng.generator.random(self.ant_count) + ants
+            chosen = np.searchsorted(cum.ravel(), r) - ants * width
+            chosen = np.minimum(np.where(active, chosen, 0), max_qty)
+
+            solutions[ants, items] = chosen
+            remaining -= chosen * item_w
+
+        return solutions, solutions @ self.value_array
+
+    def improve_ants(self, ants, vals):
+        """
+        Aplica la búsqueda local in situ a las top_k hormigas de mayor valor; el peso y el
+        valor de cada una se actualizan incrementalmente. Devuelve los valores actualizados.
+        """
+        vals = np.array(vals, dtype=float)
+        top = np.argsort(-vals, kind="stable")[:self.local_search.top_k]
+        for idx in top:
+            sol = ants[idx]
+            # Las filas de la matriz vectorizada se mejoran como listas y se copian de vuelta
+            row = sol if isinstance(sol, list) else sol.tolist()
+            _, weight = self.evaluate(row)
+            _, vals[idx] = self.local_search.improve(row, weight, vals[idx])
+            if row is not sol:
+                sol[:] = row
+        if self.instrumentation:
+            self.instrumentation.count("local_search", len(top))
+        return vals
+
+    def record_progress(self, value):
+        self.fitness_history.append(value)
+        if self.telemetry:
+            self.telemetry.record(self.fitness_history.count - 1, value)
+
     def calculate_value(self, sol):
-        return sum(sol[i] * self.values[i] for i in range(self.n_items))
+        return self.problem.value(sol)
 
     def calculate_weight(self, sol):
-        return sum(sol[i] * self.weights[i] for i in range(self.n_items))
+        return self.problem.weight(sol)
+
+    def evaluate(self, sol):
+        """(valor, peso) de la solución, usando la caché de evaluaciones si está activa."""
+        if self.evaluation_cache:
+            return self.evaluation_cache.evaluate(sol)
+        return self.problem.evaluate(sol)
 
     def update_pheromones(self, ants, vals):
+        """
+        Actualiza in situ la matriz de feromonas (n_items, max_qty+1).
+        ants es la matriz de elecciones de la colonia (una fila por hormiga) y vals sus valores.
+        """
+        ants = np.asarray(ants)
+        vals = np.asarray(vals, dtype=float)
+
+        # Las tablas de probabilidad dependen de las feromonas
+        self.table_iteration = None
+
         # Evaporación
-        for i in range(self.n_items):
-            for k in range(len(self.pheromone[i])):
-                self.pheromone[i][k] *= (1 - self.evaporation_rate)
-
-        # Deposita feromonas ponderado por rango
-        ranked = sorted(zip(ants, vals), key=lambda x: -x[1])
-        for rank, (sol, val) in enumerate(ranked, start=1):
-            if val <= 0:
-                continue
-            delta = self.q / (val * rank)
-            for i in range(self.n_items):
-                self.pheromone[i][sol[i]] += delta
-
-        # Control de límites de feromonas
-        for i in range(self.n_items):
-            max_p = max(self.pheromone[i])
-            min_p = max_p * 0.01
-            self.pheromone[i] = [min(max(min_p, p), max_p) for p in self.pheromone[i]]
-
-    def run(self):
-        """Ejecuta la colonia de hormigas reiniciando estado internamente."""
+        self.pheromone *= (1 - self.evaporation_rate)
+
+        # Deposita feromonas ponderado por rango (el mejor valor tiene rango 1)
+        ranks = np.empty(len(vals))
+        ranks[np.argsort(-vals, kind="stable")] = np.arange(1, len(vals) + 1)
+        positive = vals > 0
+        deltas = np.zeros(len(vals))
+        deltas[positive] = self.q / (vals[positive] * ranks[positive])
+        items = np.broadcast_to(np.arange(self.n_items), ants.shape)
+        np.add.at(self.pheromone, (items, ants), np.broadcast_to(deltas[:, None], ants.shape))
+
+        # Control de límites de feromonas (MAX-MIN por ítem); el relleno queda en 0
+        max_p = self.pheromone.max(axis=1, keepdims=True)
+        np.clip(self.pheromone, max_p * 0.01, max_p, out=self.pheromone, where=self.valid_mask)
+
+    def run(self, resume=False):
+        """
+        Ejecuta la colonia de hormigas reiniciando estado internamente.
+        Con resume=True y un checkpoint existente en checkpoint_path retoma esa ejecución
+        (los criterios de parada se reinician al retomar).
+        """
         start = time.time()
         # Reiniciar historial y mejor solución
-        self.fitness_history = []
+        self.fitness_history = ConvergenceTrace(self.history_size)
+        if self.telemetry:
+            self.telemetry.begin_run()
         self.convergence_iter = 0
         self.best_solution = None
         self.best_value = 0
 
         # Copia inicial de feromonas para reset
-        pheromone_init = [p.copy() for p in self.pheromone]
-
-        for it in range(self.max_iterations):
-            ants, vals = [], []
-            for _ in range(self.ant_count):
-                sol = self.generate_ant_solution(it)
-                w = self.calculate_weight(sol)
-                if w <= self.max_weight:
-                    v = self.calculate_value(sol)
-                    ants.append(sol)
-                    vals.append(v)
-                    if v > self.best_value:
-                        self.best_value = v
-                        self.best_solution = sol.copy()
-                        self.convergence_iter = it
-
-            if ants:
+        pheromone_init = self.pheromone.copy()
+        self.table_iteration = None
+        self.stop_reason = "max_iterations"
+        start_iteration = 0
+        checkpoint = self.checkpoint_path and checkpoint_file(self.checkpoint_path, self)
+        if resume and checkpoint and os.path.exists(checkpoint):
+            start_iteration, elapsed = self.restore_checkpoint(checkpoint)
+            start -= elapsed
+        self.iterations = start_iteration
+        if self.stopping:
+            self.stopping.start()
+        inst = self.instrumentation
+
+        for it in range(start_iteration, self.max_iterations):
+            if inst:
+                t = inst.start()
+            self.build_probability_tables(it)
+            if inst:
+                t = inst.stop("probability_tables", t)
+
+            if self.vectorized:
+                ants, vals = self.generate_colony_solutions(it)
+                if inst:
+                    t = inst.stop("construction", t)
+            else:
+                ants, vals = [], []
+                for _ in range(self.ant_count):
+                    sol = self.generate_ant_solution(it)
+                    if inst:
+                        t = inst.stop("construction", t)
+                    v, w = self.evaluate(sol)
+                    if w <= self.max_weight:
+                        ants.append(sol)
+                        vals.append(v)
+                    if inst:
+                        t = inst.stop("evaluation", t)
+            if inst:
+                inst.count("ants", self.ant_count)
+                inst.count("feasible_ants", len(ants))
+
+            if self.local_search and len(ants):
+                vals = self.improve_ants(ants, vals)
+                if inst:
+                    t = inst.stop("local_search", t)
+
+            if len(ants):
+                best_idx = int(np.argmax(vals))
+                if vals[best_idx] > self.best_value:
+                    self.best_value = float(vals[best_idx])
+                    self.best_solution = self.problem.solution(ants[best_idx])
+                    self.convergence_iter = it
                 self.update_pheromones(ants, vals)
+                if inst:
+                    inst.stop("pheromone_update", t)
 
-            self.fitness_history.append(self.best_value)
+            if inst:
+                inst.iteration(solver="aco", iteration=it, best_value=self.best_value,
+                               iteration_best=float(max(vals)) if len(vals) else None)
+            self.record_progress(self.best_value)
+            self.iterations = it + 1
+            if self.stopping:
+                reason = self.stopping.check(self.iterations, self.best_value)
+                if reason:
+                    self.stop_reason = reason
+                    break
+            if checkpoint and self.iterations % self.checkpoint_every == 0:
+                self.write_checkpoint(checkpoint, self.iterations, time.time() - start)
 
-        self.iterations = self.max_iterations
+        if self.telemetry:
+            self.telemetry.end_run()
         self.time_elapsed = time.time() - start
+        # El checkpoint final conserva las feromonas aprendidas para warm_start
+        if checkpoint:
+            self.write_checkpoint(checkpoint, self.iterations, self.time_elapsed)
         # Restaurar feromonas originales para futuras ejecuciones
         self.pheromone = pheromone_init
+        self.table_iteration = None
         return self.best_solution, self.best_value, self.convergence_iter, self.time_elapsed
 
+    def write_checkpoint(self, path, iteration, elapsed):
+        """Guarda el estado de la ejecución en curso en un checkpoint binario (.npz)."""
+        save_solver_state(path, self, "aco", iteration, elapsed, pheromone=self.pheromone)
+
+    def restore_checkpoint(self, path):
+        """Carga el estado de un checkpoint; devuelve (iteración siguiente, tiempo ya transcurrido)."""
+        meta, arrays = restore_solver_state(path, self, "aco")
+        if arrays["pheromone"].shape != self.pheromone.shape:
+            raise ValueError(f"Feromonas del checkpoint con forma {arrays['pheromone'].shape}, "
+                             f"se esperaba {self.pheromone.shape}")
+        self.pheromone = arrays["pheromone"].copy()
+        self.table_iteration = None
+        return meta["iteration"], meta["elapsed"]
+
+    def warm_start(self, path):
+        """
+        Parte de las feromonas aprendidas en un checkpoint en lugar de 0.1 uniforme; queda como
+        estado inicial de las próximas ejecuciones. Si el catálogo cambió, las filas se emparejan
+        por índice de ítem: las cantidades nuevas reciben el piso MAX-MIN de su fila y los ítems
+        nuevos 0.1.
+        """
+        _, arrays = load_checkpoint(path, "aco")
+        learned = arrays["pheromone"]
+        rows = min(len(learned), self.n_items)
+        cols = min(learned.shape[1], self.pheromone.shape[1])
+        # Celdas aprendidas: válidas en ambos catálogos (el relleno del checkpoint vale 0)
+        copied = np.zeros_like(self.valid_mask)
+        copied[:rows, :cols] = self.valid_mask[:rows, :cols] & (learned[:rows, :cols] > 0)
+        pheromone = np.where(self.valid_mask, 0.1, 0.0)
+        pheromone[copied] = learned[:rows, :cols][copied[:rows, :cols]]
+        # Mismo límite MAX-MIN que update_pheromones, con el máximo de lo aprendido en cada fila
+        max_p = np.where(copied, pheromone, 0.0).max(axis=1, keepdims=True)
+        known = copied.any(axis=1, keepdims=True)
+        pheromone = np.where(self.valid_mask & known & ~copied, max_p * 0.01, pheromone)
+        np.clip(pheromone, max_p * 0.01, max_p, out=pheromone, where=self.valid_mask & known)
+        pheromone[~self.valid_mask] = 0.0
+        self.pheromone = pheromone
+        self.table_iteration = None
+
     def print_results(self):
         print("\n--- Resultados Colonia de Hormigas ---")
-        print(f"Tiempo: {self.time_elapsed:.4f}s | Iteraciones: {self.iterations} | Convergencia: {self.convergence_iter}")
+        print(f"Tiempo: {self.time_elapsed:.4f}s | Iteraciones: {self.iterations} ({self.stop_reason}) | Convergencia: {self.convergence_iter}")
         print(f"Mejor valor: {self.best_value} | Peso: {self.calculate_weight(self.best_solution)}")
+        if self.evaluation_cache:
+            stats = self.evaluation_cache.stats()
+            print(f"Caché de evaluaciones: {stats['hit_rate']:.1%} aciertos ({stats['size']} entradas)")
         print("Solución:")
         for i, q in enumerate(self.best_solution):
             if q > 0:
                 print(f"  Ítem {i+1}: {q} unidades (valor {q*self.values[i]}, peso {q*self.weights[i]})")
 
     def plot_convergence(self):
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(10,6))
-        plt.plot(self.fitness_history, 'r-')
+        plt.plot(*self.fitness_history.points(), 'r-')
         plt.title('Convergencia Colonia de Hormigas')
         plt.xlabel('Iteración')
         plt.ylabel('Valor mochila')
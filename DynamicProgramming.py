@@ -0,0 +1,137 @@
+import time
+import numpy as np
+from problem import KnapsackProblem
+
+
+class KnapsackDynamicProgramming:
+    def __init__(self, scale=1000, max_cells=5 * 10**7):
+        """
+        Inicializa el solver exacto por programación dinámica.
+        Los pesos se escalan por `scale` a enteros (exacto si tienen a lo sumo log10(scale) decimales);
+        max_cells limita el tamaño de la tabla de decisiones (partes x capacidad).
+        """
+        self.scale = scale
+        self.max_cells = max_cells
+
+        # Datos del problema
+        self.problem = None
+        self.weights = []
+        self.values = []
+        self.quantities = []
+        self.max_weight = 0
+        self.n_items = 0
+
+        # Descomposición binaria de cantidades
+        self.part_items = None
+        self.part_counts = None
+        self.part_weights = None
+        self.part_values = None
+        self.capacity = 0
+
+        # Resultados
+        self.iterations = 0
+        self.convergence_iter = 0
+        self.best_solution = None
+        self.best_value = 0
+        self.fitness_history = []
+        self.time_elapsed = 0
+        self.stop_reason = None
+
+    def set_problem_data(self, data):
+        """
+        Establece los datos del problema desde un diccionario o un KnapsackProblem.
+        """
+        self.problem = KnapsackProblem.from_data(data)
+        if isinstance(data, KnapsackProblem):
+            data = data.to_data()
+        self.weights = data["weights"]
+        self.values = data["values"]
+        self.quantities = data["quantities"]
+        self.max_weight = data["max_weight"]
+        self.n_items = data["n_items"]
+
+        # Pesos redondeados hacia arriba para no aceptar nunca soluciones que excedan la capacidad
+        int_weights = np.ceil(self.problem.weights * self.scale - 1e-9).astype(np.int64)
+        self.capacity = int(np.floor(self.max_weight * self.scale + 1e-9))
+
+        # Cada ítem con q unidades se divide en partes 1, 2, 4, ..., resto (problema 0/1 equivalente);
+        # un catálogo compilado (catalog.Catalog) ya trae esta descomposición
+        compiled = data.get("compiled")
+        if compiled:
+            self.part_items = compiled["part_items"]
+            self.part_counts = compiled["part_counts"]
+        else:
+            items, counts = [], []
+            for i, q in enumerate(self.quantities):
+                p = 1
+                while q > 0:
+                    take = min(p, q)
+                    items.append(i)
+                    counts.append(take)
+                    q -= take
+                    p *= 2
+            self.part_items = np.array(items, dtype=int)
+            self.part_counts = np.array(counts, dtype=int)
+        self.part_weights = self.part_counts * int_weights[self.part_items]
+        self.part_values = self.part_counts * self.problem.values[self.part_items]
+        return True
+
+    def set_seed(self, seed):
+        """El solver es determinista; se acepta por compatibilidad con los demás."""
+        pass
+
+    def is_tractable(self):
+        """Indica si la tabla (partes x capacidad) cabe dentro de max_cells."""
+        return len(self.part_items) * (self.capacity + 1) <= self.max_cells
+
+    def run(self):
+        """Resuelve el problema de forma exacta; devuelve la misma tupla que los demás solvers."""
+        start = time.time()
+        if not self.is_tractable():
+            raise ValueError(f"Instancia demasiado grande para DP: {len(self.part_items)} partes x "
+                             f"{self.capacity + 1} capacidades > {self.max_cells} celdas")
+
+        cap = self.capacity
+        dp = np.zeros(cap + 1)
+        keep = np.zeros((len(self.part_items), cap + 1), dtype=bool)
+
+        # DP 1-D sobre la capacidad, vectorizada en cada parte
+        for j, (w, v) in enumerate(zip(self.part_weights, self.part_values)):
+            if w > cap:
+                continue
+            candidate = dp[:cap + 1 - w] + v
+            better = candidate > dp[w:]
+            keep[j, w:] = better
+            dp[w:][better] = candidate[better]
+
+        # Reconstrucción de la solución
+        solution = [0] * self.n_items
+        c = cap
+        for j in range(len(self.part_items) - 1, -1, -1):
+            if keep[j, c]:
+                solution[self.part_items[j]] += int(self.part_counts[j])
+                c -= int(self.part_weights[j])
+
+        self.best_solution = self.problem.solution(solution)
+        self.best_value = float(dp[cap])
+        self.fitness_history = [self.best_value]
+        self.iterations = len(self.part_items)
+        self.convergence_iter = 0
+        self.stop_reason = "optimal"
+        self.time_elapsed = time.time() - start
+        return self.best_solution, self.best_value, self.convergence_iter, self.time_elapsed
+
+    def calculate_value(self, sol):
+        return self.problem.value(sol)
+
+    def calculate_weight(self, sol):
+        return self.problem.weight(sol)
+
+    def print_results(self):
+        print("\n--- Resultados Programación Dinámica (óptimo exacto) ---")
+        print(f"Tiempo: {self.time_elapsed:.4f}s | Partes binarias: {self.iterations} | Capacidad escalada: {self.capacity}")
+        print(f"Valor óptimo: {self.best_value} | Peso: {self.calculate_weight(self.best_solution)}")
+        print("Solución:")
+        for i, q in enumerate(self.best_solution):
+            if q > 0:
+                print(f"  Ítem {i+1}: {q} unidades (valor {q*self.values[i]}, peso {q*self.weights[i]})")
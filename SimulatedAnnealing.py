@@ -1,21 +1,57 @@
-import matplotlib.pyplot as plt
+import os
 import time
-import random
 import math
 import statistics
+import numpy as np
+from random_stream import RandomStream
+from telemetry import ConvergenceTrace
+from problem import KnapsackProblem
+from checkpoint import checkpoint_file, save_solver_state, restore_solver_state
+from construction import ratio_order, greedy_solution, randomized_greedy_solution, repair_worst_ratio
 
 class KnapsackSimulatedAnnealing:
-    def __init__(self, initial_temp=1000, final_temp=1, cooling_rate=0.95, max_iterations=1000):
+    def __init__(self, initial_temp=1000, final_temp=1, cooling_rate=0.95, max_iterations=1000, incremental=False,
+                 chains=1, swap_interval=10, seed=None, instrumentation=None, stopping=None,
+                 initial_solution="random", repair="random", history_size=2048, telemetry=None,
+                 checkpoint_path=None, checkpoint_every=500):
         """
         Inicializa el algoritmo de enfriamiento simulado.
+        Con incremental=True los vecinos se aplican como movimientos (índice, delta)
+        sobre la solución actual y peso/valor se actualizan sin recorrer la solución.
+        Con chains > 1 se usa templado paralelo: `chains` cadenas a temperaturas fijas
+        entre final_temp e initial_temp que intercambian estados cada swap_interval pasos.
+        seed puede ser un entero o un numpy.random.Generator para ejecuciones reproducibles.
+        instrumentation (instrumentation.Instrumentation) activa contadores y temporizadores.
+        stopping (stopping.StoppingCriteria) añade criterios de parada anticipada.
+        initial_solution: "random", "greedy" (por razón valor/peso) o "randomized_greedy".
+        repair: "random" quita unidades al azar; "ratio" quita primero las de peor razón valor/peso.
+        history_size acota los puntos de fitness_history; telemetry (telemetry.TelemetryWriter)
+        guarda la traza completa de cada ejecución en disco.
+        Con checkpoint_path el estado (soluciones, temperatura, iteración, generador) se guarda
+        cada checkpoint_every iteraciones y al terminar; run(resume=True) continúa desde él.
+        La ruta puede contener {pid} y {seed} (la semilla de set_seed) para un archivo por ejecución.
         """
         self.initial_temp = initial_temp
         self.temp = initial_temp
         self.final_temp = final_temp
         self.cooling_rate = cooling_rate
         self.max_iterations = max_iterations
+        self.incremental = incremental
+        self.chains = chains
+        self.swap_interval = swap_interval
+        self.seed = seed
+        self.rng = RandomStream(seed)
+        self.instrumentation = instrumentation
+        self.stopping = stopping
+        self.initial_solution = initial_solution
+        self.repair = repair
+        self.history_size = history_size
+        self.telemetry = telemetry
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
 
         # Datos del problema
+        self.problem = None
         self.weights = []
         self.values = []
         self.quantities = []
@@ -31,40 +67,60 @@ class KnapsackSimulatedAnnealing:
         # Seguimiento
         self.iterations = 0
         self.convergence_iter = 0
-        self.fitness_history = []
+        self.fitness_history = ConvergenceTrace(history_size)
         self.time_elapsed = 0
+        self.stop_reason = None
 
     def set_problem_data(self, data):
         """
-        Establece los datos del problema desde un diccionario.
+        Establece los datos del problema desde un diccionario o un KnapsackProblem.
         """
+        self.problem = KnapsackProblem.from_data(data)
+        if isinstance(data, KnapsackProblem):
+            data = data.to_data()
         self.weights = data["weights"]
         self.values = data["values"]
         self.quantities = data["quantities"]
         self.max_weight = data["max_weight"]
+        # Orden por razón valor/peso, de peor a mejor, para la reparación determinista
+        compiled = data.get("compiled")
+        order = compiled["order"] if compiled else ratio_order(self.weights, self.values)
+        self.worst_first = order[::-1]
         return True
 
+    def set_seed(self, seed):
+        """Reinicia la fuente aleatoria; las ejecuciones siguientes son reproducibles."""
+        self.seed = seed
+        self.rng = RandomStream(seed)
+
     def generate_initial_solution(self):
         n = len(self.weights)
-        solution = [0] * n
-        total_weight = 0
-        for i in range(n):
-            max_possible = min(self.quantities[i], int((self.max_weight - total_weight) / self.weights[i]))
-            if max_possible > 0:
-                solution[i] = random.randint(0, max_possible)
-                total_weight += solution[i] * self.weights[i]
+        if self.initial_solution == "greedy":
+            solution = greedy_solution(self.weights, self.values, self.quantities, self.max_weight,
+                                       self.worst_first[::-1])
+        elif self.initial_solution == "randomized_greedy":
+            solution = randomized_greedy_solution(self.weights, self.values, self.quantities, self.max_weight,
+                                                  self.rng.generator)
+        else:
+            solution = [0] * n
+            total_weight = 0
+            for i in range(n):
+                max_possible = min(self.quantities[i], int((self.max_weight - total_weight) / self.weights[i]))
+                if max_possible > 0:
+                    solution[i] = self.rng.randint(0, max_possible)
+                    total_weight += solution[i] * self.weights[i]
         self.current_solution = solution
-        self.best_solution = solution.copy()
+        self.best_solution = self.problem.solution(solution)
         self.current_weight = self.calculate_weight(solution)
         self.current_value = self.calculate_value(solution)
         self.best_value = self.current_value
         return solution
 
     def calculate_weight(self, solution):
-        return sum(solution[i] * self.weights[i] for i in range(len(solution)))
+        return self.problem.weight(solution)
 
     def calculate_value(self, solution):
-        return sum(solution[i] * self.values[i] for i in range(len(solution)))
+        return self.problem.value(solution)
 
     def is_valid_solution(self, solution):
         if self.calculate_weight(solution) > self.max_weight:
@@ -77,43 +133,144 @@ class KnapsackSimulatedAnnealing:
     def generate_neighbor(self, solution):
         n = len(solution)
         neighbor = solution.copy()
-        idx = random.randint(0, n-1)
-        change = random.choice([-1, 1])
+        idx = self.rng.randint(0, n-1)
+        change = self.rng.choice([-1, 1])
         if change == -1 and neighbor[idx] == 0:
             change = 1
         if change == 1 and neighbor[idx] >= self.quantities[idx]:
             change = -1
         neighbor[idx] += change
-        if not self.is_valid_solution(neighbor):
+        spins = 0
+        if self.repair == "ratio":
+            weight = self.calculate_weight(neighbor)
+            if weight > self.max_weight:
+                spins = len(repair_worst_ratio(neighbor, self.weights, self.max_weight, weight,
+                                               self.worst_first, protect=idx)[0])
+        elif not self.is_valid_solution(neighbor):
             while self.calculate_weight(neighbor) > self.max_weight:
-                remove_idx = random.randint(0, n-1)
+                spins += 1
+                remove_idx = self.rng.randint(0, n-1)
                 if neighbor[remove_idx] > 0:
                     neighbor[remove_idx] -= 1
+        if self.instrumentation:
+            self.instrumentation.count("repair_iterations", spins)
         return neighbor
 
+    def apply_move(self, solution):
+        """
+        Aplica in situ el mismo vecino que generate_neighbor, actualizando current_weight.
+        Devuelve la lista de cambios (índice, delta) para poder deshacerlos.
+        """
+        n = len(solution)
+        idx = self.rng.randint(0, n-1)
+        change = self.rng.choice([-1, 1])
+        if change == -1 and solution[idx] == 0:
+            change = 1
+        if change == 1 and solution[idx] >= self.quantities[idx]:
+            change = -1
+        solution[idx] += change
+        self.current_weight += change * self.weights[idx]
+        moves = [(idx, change)]
+        spins = 0
+        if self.repair == "ratio":
+            if self.current_weight > self.max_weight:
+                repairs, self.current_weight = repair_worst_ratio(solution, self.weights, self.max_weight,
+                                                                  self.current_weight, self.worst_first, protect=idx)
+                moves.extend(repairs)
+                spins = len(repairs)
+        else:
+            # Reparación: cada unidad retirada descuenta su peso sin volver a sumar la solución
+            while self.current_weight > self.max_weight:
+                spins += 1
+                remove_idx = self.rng.randint(0, n-1)
+                if solution[remove_idx] > 0:
+                    solution[remove_idx] -= 1
+                    self.current_weight -= self.weights[remove_idx]
+                    moves.append((remove_idx, -1))
+        if self.instrumentation:
+            self.instrumentation.count("repair_iterations", spins)
+        return moves
+
+    def undo_move(self, solution, moves):
+        for idx, change in reversed(moves):
+            solution[idx] -= change
+            self.current_weight -= change * self.weights[idx]
+
+    def record_progress(self, value):
+        self.fitness_history.append(value)
+        if self.telemetry:
+            self.telemetry.record(self.fitness_history.count - 1, value)
+
     def accept_probability(self, current_value, new_value, temperature):
         if new_value > current_value:
             return 1.0
         return math.exp((new_value - current_value) / temperature)
 
-    def run(self):
+    def run(self, resume=False):
+        """
+        Ejecuta el enfriamiento simulado. Con resume=True y un checkpoint existente en
+        checkpoint_path retoma esa ejecución (los criterios de parada se reinician al retomar).
+        """
+        if self.chains > 1:
+            return self.run_tempering(resume)
         start_time = time.time()
-        self.generate_initial_solution()
-        self.temp = self.initial_temp
-        self.fitness_history = [self.current_value]
-        iteration = 0
-        iterations_without_improvement = 0
-        self.convergence_iter = 0
+        if self.telemetry:
+            self.telemetry.begin_run()
+        checkpoint = self.checkpoint_path and checkpoint_file(self.checkpoint_path, self)
+        if resume and checkpoint and os.path.exists(checkpoint):
+            meta, arrays = restore_solver_state(checkpoint, self, "sa")
+            if meta.get("chains", 1) != self.chains:
+                raise ValueError(f"El checkpoint es de {meta.get('chains')} cadenas, no {self.chains}")
+            self.current_solution = arrays["current_solution"].tolist()
+            self.current_value = meta["current_value"]
+            self.current_weight = meta["current_weight"]
+            self.temp = meta["temp"]
+            iteration = meta["iteration"]
+            iterations_without_improvement = meta["iterations_without_improvement"]
+            start_time -= meta["elapsed"]
+        else:
+            self.generate_initial_solution()
+            self.temp = self.initial_temp
+            self.fitness_history = ConvergenceTrace(self.history_size)
+            self.record_progress(self.current_value)
+            iteration = 0
+            iterations_without_improvement = 0
+            self.convergence_iter = 0
+        self.stop_reason = None
+        if self.stopping:
+            self.stopping.start()
+        inst = self.instrumentation
         while self.temp > self.final_temp and iteration < self.max_iterations:
-            neighbor = self.generate_neighbor(self.current_solution)
-            neighbor_value = self.calculate_value(neighbor)
+            if inst:
+                t = inst.start()
+            if self.incremental:
+                moves = self.apply_move(self.current_solution)
+                if inst:
+                    t = inst.stop("neighbor", t)
+                neighbor_value = self.current_value + sum(change * self.values[i] for i, change in moves)
+            else:
+                neighbor = self.generate_neighbor(self.current_solution)
+                if inst:
+                    t = inst.stop("neighbor", t)
+                neighbor_value = self.calculate_value(neighbor)
+            if inst:
+                t = inst.stop("evaluation", t)
             prob = self.accept_probability(self.current_value, neighbor_value, self.temp)
-            if random.random() < prob:
-                self.current_solution = neighbor
+            accepted = self.rng.random() < prob
+            if self.incremental and not accepted:
+                self.undo_move(self.current_solution, moves)
+            if inst:
+                inst.count("accepted" if accepted else "rejected")
+            if accepted:
+                if not self.incremental:
+                    self.current_solution = neighbor
+                    self.current_weight = self.calculate_weight(neighbor)
                 self.current_value = neighbor_value
-                self.current_weight = self.calculate_weight(neighbor)
                 if self.current_value > self.best_value:
-                    self.best_solution = self.current_solution.copy()
+                    self.best_solution = self.problem.solution(self.current_solution)
+                    if self.incremental:
+                        # Resincroniza el peso acumulado para evitar deriva de punto flotante
+                        self.current_weight = self.calculate_weight(self.current_solution)
                     self.best_value = self.current_value
                     self.convergence_iter = iteration
                     iterations_without_improvement = 0
@@ -121,20 +278,189 @@ class KnapsackSimulatedAnnealing:
                     iterations_without_improvement += 1
             else:
                 iterations_without_improvement += 1
+            if inst:
+                inst.stop("acceptance", t)
+                inst.iteration(solver="sa", iteration=iteration, temperature=self.temp,
+                               current_value=self.current_value, best_value=self.best_value)
             self.temp *= self.cooling_rate
-            self.fitness_history.append(self.best_value)
+            self.record_progress(self.best_value)
             iteration += 1
             if iterations_without_improvement > 100:
                 self.temp = self.initial_temp * 0.5
                 iterations_without_improvement = 0
+                if inst:
+                    inst.count("reheats")
+            if self.stopping:
+                self.stop_reason = self.stopping.check(iteration, self.best_value)
+                if self.stop_reason:
+                    break
+            if checkpoint and iteration % self.checkpoint_every == 0:
+                self.write_checkpoint(checkpoint, iteration, time.time() - start_time,
+                                      iterations_without_improvement)
+        if self.stop_reason is None:
+            self.stop_reason = "temperature" if self.temp <= self.final_temp else "max_iterations"
         self.iterations = iteration
+        if self.telemetry:
+            self.telemetry.end_run()
         self.time_elapsed = time.time() - start_time
+        if checkpoint:
+            self.write_checkpoint(checkpoint, iteration, self.time_elapsed, iterations_without_improvement)
         return self.best_solution, self.best_value, self.convergence_iter, self.time_elapsed
 
+    def run_tempering(self, resume=False):
+        """
+        Templado paralelo: todas las cadenas avanzan a la vez sobre una matriz (chains, n_items).
+        Cada paso aplica un movimiento ±1 por cadena, repara las que exceden la capacidad,
+        acepta con Metropolis y periódicamente intercambia réplicas vecinas en la escalera.
+        """
+        start_time = time.time()
+        weights = self.problem.weights
+        values = self.problem.values
+        quantities = self.problem.quantities
+        n = len(weights)
+        rows = np.arange(self.chains)
+        temps = np.geomspace(self.final_temp, self.initial_temp, self.chains)
+        if self.repair == "ratio":
+            # Puntaje de reparación: mayor para peor razón valor/peso (worst_first[0] es el peor)
+            ratio_rank = np.empty(n)
+            ratio_rank[self.worst_first] = np.arange(n, 0, -1)
+
+        if self.telemetry:
+            self.telemetry.begin_run()
+        checkpoint = self.checkpoint_path and checkpoint_file(self.checkpoint_path, self)
+        if resume and checkpoint and os.path.exists(checkpoint):
+            meta, arrays = restore_solver_state(checkpoint, self, "sa")
+            if meta.get("chains") != self.chains:
+                raise ValueError(f"El checkpoint es de {meta.get('chains')} cadenas, no {self.chains}")
+            states = arrays["states"].copy()
+            state_weights = arrays["state_weights"].copy()
+            state_values = arrays["state_values"].copy()
+            start_iteration = meta["iteration"]
+            start_time -= meta["elapsed"]
+        else:
+            states = np.array([self.generate_initial_solution() for _ in range(self.chains)], dtype=int)
+            state_weights = states @ weights
+            state_values = states @ values
+            best = int(np.argmax(state_values))
+            self.best_solution = self.problem.solution(states[best])
+            self.best_value = float(state_values[best])
+            self.fitness_history = ConvergenceTrace(self.history_size)
+            self.record_progress(self.best_value)
+            self.convergence_iter = 0
+            start_iteration = 0
+        self.iterations = start_iteration
+        self.stop_reason = "max_iterations"
+        if self.stopping:
+            self.stopping.start()
+        inst = self.instrumentation
+
+        for iteration in range(start_iteration, self.max_iterations):
+            if inst:
+                t = inst.start()
+            # Movimiento ±1 en un índice aleatorio de cada cadena
+            idx = self.rng.generator.integers(0, n, self.chains)
+            change = self.rng.generator.choice([-1, 1], self.chains)
+            current = states[rows, idx]
+            change[(change == -1) & (current == 0)] = 1
+            change[(change == 1) & (current >= quantities[idx])] = -1
+            change[current + change < 0] = 0
+
+            candidates = states.copy()
+            candidates[rows, idx] += change
+            cand_weights = state_weights + change * weights[idx]
+            cand_values = state_values + change * values[idx]
+            if inst:
+                t = inst.stop("neighbor", t)
+
+            # Reparación: quita una unidad a cada cadena infactible hasta que todas quepan, al azar o
+            # (repair="ratio") del ítem de peor razón, dejando el recién agregado para el final
+            over = np.flatnonzero(cand_weights > self.max_weight)
+            while len(over):
+                if inst:
+                    inst.count("repair_iterations", len(over))
+                if self.repair == "ratio":
+                    scores = np.broadcast_to(ratio_rank + n, (len(over), n)).copy()
+                    scores[np.arange(len(over)), idx[over]] -= n
+                else:
+                    scores = self.rng.generator.random((len(over), n))
+                scores *= candidates[over] > 0
+                remove = np.argmax(scores, axis=1)
+                candidates[over, remove] -= 1
+                cand_weights[over] -= weights[remove]
+                cand_values[over] -= values[remove]
+                over = over[cand_weights[over] > self.max_weight]
+            if inst:
+                t = inst.stop("repair", t)
+
+            # Aceptación de Metropolis vectorizada
+            gain = cand_values - state_values
+            accept = (gain >= 0) | (self.rng.generator.random(self.chains) < np.exp(np.minimum(gain, 0) / temps))
+            states[accept] = candidates[accept]
+            state_weights[accept] = cand_weights[accept]
+            state_values[accept] = cand_values[accept]
+            if inst:
+                inst.count("accepted", int(accept.sum()))
+                inst.count("rejected", self.chains - int(accept.sum()))
+
+            best = int(np.argmax(state_values))
+            if state_values[best] > self.best_value:
+                self.best_value = float(state_values[best])
+                self.best_solution = self.problem.solution(states[best])
+                self.convergence_iter = iteration
+
+            # Intercambio de réplicas entre temperaturas vecinas (pares pares/impares alternados)
+            if (iteration + 1) % self.swap_interval == 0:
+                first = np.arange((iteration // self.swap_interval) % 2, self.chains - 1, 2)
+                second = first + 1
+                log_p = (1 / temps[first] - 1 / temps[second]) * (state_values[second] - state_values[first])
+                swap = np.log(self.rng.generator.random(len(first))) < log_p
+                a, b = first[swap], second[swap]
+                states[a], states[b] = states[b], states[a]
+                state_weights[a], state_weights[b] = state_weights[b], state_weights[a]
+                state_values[a], state_values[b] = state_values[b], state_values[a]
+                if inst:
+                    inst.count("swaps", len(a))
+
+            if inst:
+                inst.stop("acceptance", t)
+                inst.iteration(solver="sa", iteration=iteration, temperature=temps[0],
+                               current_value=float(state_values[0]), best_value=self.best_value)
+            self.record_progress(self.best_value)
+            self.iterations = iteration + 1
+            if self.stopping:
+                reason = self.stopping.check(self.iterations, self.best_value)
+                if reason:
+                    self.stop_reason = reason
+                    break
+            if checkpoint and self.iterations % self.checkpoint_every == 0:
+                self.write_checkpoint(checkpoint, self.iterations, time.time() - start_time, states=states,
+                                      state_weights=state_weights, state_values=state_values)
+
+        # La cadena más fría queda como solución actual
+        self.current_solution = states[0].tolist()
+        self.current_value = float(state_values[0])
+        self.current_weight = float(state_weights[0])
+        self.temp = temps[0]
+        if self.telemetry:
+            self.telemetry.end_run()
+        self.time_elapsed = time.time() - start_time
+        if checkpoint:
+            self.write_checkpoint(checkpoint, self.iterations, self.time_elapsed, states=states,
+                                  state_weights=state_weights, state_values=state_values)
+        return self.best_solution, self.best_value, self.convergence_iter, self.time_elapsed
+
+    def write_checkpoint(self, path, iteration, elapsed, iterations_without_improvement=0, **chains):
+        """Guarda el estado de la ejecución en curso en un checkpoint binario (.npz); chains son las matrices del templado."""
+        save_solver_state(path, self, "sa", iteration, elapsed, chains=self.chains,
+                          current_solution=np.asarray(self.current_solution, dtype=np.int64),
+                          current_value=float(self.current_value), current_weight=float(self.current_weight),
+                          temp=float(self.temp), iterations_without_improvement=iterations_without_improvement,
+                          **chains)
+
     def print_results(self):
         print("\n--- Resultados del Enfriamiento Simulado ---")
         print(f"Tiempo de ejecución: {self.time_elapsed:.4f} segundos")
-        print(f"Iteraciones totales: {self.iterations}")
+        print(f"Iteraciones totales: {self.iterations} (parada: {self.stop_reason})")
         print(f"Iteración de convergencia: {self.convergence_iter}")
         print(f"Mejor valor encontrado: {self.best_value}")
         print(f"Peso total de la mejor solución: {self.calculate_weight(self.best_solution)}")
@@ -144,8 +470,10 @@ class KnapsackSimulatedAnnealing:
                 print(f"Objeto {i+1}: {q} unidades, Valor: {q*self.values[i]}, Peso: {q*self.weights[i]}")
 
     def plot_convergence(self):
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(10, 6))
-        plt.plot(range(len(self.fitness_history)), self.fitness_history, 'b-')
+        plt.plot(*self.fitness_history.points(), 'b-')
         plt.title('Convergencia de Enfriamiento Simulado')
         plt.xlabel('Iteraciones')
         plt.ylabel('Valor de la mochila')
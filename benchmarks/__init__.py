@@ -0,0 +1,2 @@
+from benchmarks.instances import generate_instance
+from benchmarks.run import run_benchmark
@@ -0,0 +1,26 @@
+import numpy as np
+
+
+def generate_instance(n_items, max_quantity=10, capacity_ratio=0.3, correlated=False, seed=None):
+    """
+    Genera una instancia sintética de mochila acotada con el mismo formato que load_data.
+    Con correlated=True el valor crece con el peso (instancias más difíciles para las heurísticas);
+    la capacidad es capacity_ratio veces el peso total disponible.
+    """
+    rng = np.random.default_rng(seed)
+    # Pesos con 3 decimales para que la DP escalada x1000 sea exacta
+    weights = np.round(rng.uniform(0.5, 5.0, n_items), 3)
+    quantities = rng.integers(1, max_quantity + 1, n_items)
+    if correlated:
+        values = np.round(weights * 10000 + rng.uniform(-1000, 1000, n_items) + 2000)
+    else:
+        values = rng.integers(1000, 50000, n_items).astype(float)
+    max_weight = round(float(capacity_ratio * (weights * quantities).sum()), 3)
+
+    return {
+        "weights": weights.tolist(),
+        "values": values.tolist(),
+        "quantities": quantities.tolist(),
+        "max_weight": max_weight,
+        "n_items": n_items
+    }
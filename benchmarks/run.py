@@ -0,0 +1,120 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import contextlib
+import numpy as np
+from benchmarks.instances import generate_instance
+from solvers import SOLVERS, load_configs, build_solver
+from DynamicProgramming import KnapsackDynamicProgramming
+from AnalisisDesempeno import brecha_optimalidad
+
+
+def count_evaluations(algoritmo, solver):
+    """Número de soluciones evaluadas en la última ejecución."""
+    if algoritmo == "sa":
+        return solver.iterations * max(solver.chains, 1)
+    if algoritmo == "aco":
+        return solver.iterations * solver.ant_count
+    return solver.iterations
+
+
+def timed_run(solver):
+    """Ejecuta el solver silenciando su salida y mide el tiempo con perf_counter."""
+    with contextlib.redirect_stdout(sys.stderr):
+        start = time.perf_counter()
+        _, valor, iter_conv, _ = solver.run()
+        elapsed = time.perf_counter() - start
+    return valor, iter_conv, elapsed
+
+
+def peak_memory(solver):
+    """Pico de memoria (KB) asignada por Python durante una ejecución adicional."""
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            solver.run()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(configs, sizes, max_quantity=10, correlations=(False, True), capacity_ratio=0.3,
+                  repeats=3, seed=0, measure_memory=True):
+    """
+    Ejecuta cada configuración (algoritmo, params) sobre instancias sintéticas de cada tamaño.
+    Devuelve una lista de registros con calidad, tiempo, rendimiento y memoria; el óptimo
+    por DP se incluye cuando la instancia es tratable.
+    """
+    records = []
+    for n_items in sizes:
+        for correlated in correlations:
+            data = generate_instance(n_items, max_quantity, capacity_ratio, correlated, seed=seed + n_items)
+            dp = KnapsackDynamicProgramming()
+            dp.set_problem_data(data)
+            optimo = dp.run()[1] if dp.is_tractable() else None
+
+            for algoritmo, params in configs:
+                solver = build_solver(algoritmo, params)
+                solver.set_problem_data(data)
+                memoria = peak_memory(solver) if measure_memory else None
+                for rep in range(repeats):
+                    solver.set_seed(seed + rep)
+                    valor, iter_conv, elapsed = timed_run(solver)
+                    evaluaciones = count_evaluations(algoritmo, solver)
+                    records.append({
+                        "n_items": n_items,
+                        "cantidad_max": max_quantity,
+                        "correlacionada": correlated,
+                        "capacidad": data["max_weight"],
+                        "algoritmo": algoritmo,
+                        "params": params,
+                        "repeticion": rep,
+                        "valor": valor,
+                        "optimo": optimo,
+                        "brecha": None if optimo is None else brecha_optimalidad(valor, optimo),
+                        "iter_convergencia": iter_conv,
+                        "tiempo": elapsed,
+                        "iteraciones": solver.iterations,
+                        "parada": solver.stop_reason,
+                        "evaluaciones": evaluaciones,
+                        "iter_por_s": solver.iterations / elapsed if elapsed > 0 else None,
+                        "eval_por_s": evaluaciones / elapsed if elapsed > 0 else None,
+                        "memoria_pico_kb": memoria,
+                    })
+                    print(f"n={n_items} corr={correlated} {algoritmo} rep={rep}: valor={valor:.0f} "
+                          f"t={elapsed:.3f}s", file=sys.stderr)
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de SA/ACO sobre instancias sintéticas.")
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[50, 200, 500], help="Valores de n_items")
+    parser.add_argument("--cantidad-max", type=int, default=10, help="Cantidad máxima por ítem")
+    parser.add_argument("--capacidad", type=float, default=0.3, help="Capacidad como fracción del peso total")
+    parser.add_argument("-a", "--algoritmos", nargs="+", choices=sorted(SOLVERS), default=["sa", "aco"])
+    parser.add_argument("-c", "--config", help="JSON de configuraciones (mismo formato que main.py)")
+    parser.add_argument("-n", "--repeticiones", type=int, default=3)
+    parser.add_argument("-s", "--semilla", type=int, default=0)
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir el pico de memoria")
+    parser.add_argument("-o", "--salida", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    records = run_benchmark(load_configs(args.config, args.algoritmos), args.tamanos, args.cantidad_max, (False, True), args.capacidad,
+                            args.repeticiones, args.semilla, not args.sin_memoria)
+    report = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "resultados": records,
+    }
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados guardados en {args.salida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
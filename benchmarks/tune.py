@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import contextlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.instances import generate_instance
+from solvers import DEFAULT_PARAMS, build_solver, iniciar_worker, worker_state
+from excel_reader import load_data
+from DynamicProgramming import KnapsackDynamicProgramming
+
+# Espacios de búsqueda: ("log", a, b), ("int_log", a, b), ("uniform", a, b) o ("choice", [opciones])
+PARAM_SPACES = {
+    "sa": {
+        "initial_temp": ("log", 10, 10000),
+        "final_temp": ("log", 0.01, 10),
+        "cooling_rate": ("uniform", 0.8, 0.999),
+        "max_iterations": ("int_log", 100, 5000),
+        "incremental": ("choice", [False, True]),
+        "initial_solution": ("choice", ["random", "greedy", "randomized_greedy"]),
+        "repair": ("choice", ["random", "ratio"]),
+    },
+    "aco": {
+        "ant_count": ("int_log", 5, 100),
+        "max_iterations": ("int_log", 20, 400),
+        "alpha": ("uniform", 0.5, 3.0),
+        "beta": ("uniform", 0.5, 5.0),
+        "evaporation_rate": ("uniform", 0.05, 0.9),
+        "vectorized": ("choice", [False, True]),
+    },
+}
+
+def sample_config(space, generator):
+    """Muestrea una configuración del espacio con un numpy.random.Generator."""
+    params = {}
+    for name, (kind, *args) in space.items():
+        if kind == "choice":
+            params[name] = args[0][int(generator.integers(len(args[0])))]
+        elif kind == "uniform":
+            params[name] = float(generator.uniform(args[0], args[1]))
+        else:
+            value = math.exp(generator.uniform(math.log(args[0]), math.log(args[1])))
+            params[name] = int(round(value)) if kind == "int_log" else float(value)
+    return params
+
+
+def _evaluar(config, params, instancia, semilla):
+    solver = build_solver(worker_state["algoritmo"], params)
+    solver.set_problem_data(worker_state["instancias"][instancia])
+    solver.set_seed(semilla)
+    with contextlib.redirect_stdout(sys.stderr):
+        start = time.process_time()
+        _, valor, _, _ = solver.run()
+        tiempo = time.process_time() - start
+    return config, instancia, semilla, valor, tiempo
+
+
+def reference_values(instancias):
+    """Óptimo por DP de cada instancia tratable (None si no lo es)."""
+    referencias = []
+    for data in instancias:
+        dp = KnapsackDynamicProgramming()
+        dp.set_problem_data(data)
+        with contextlib.redirect_stdout(sys.stderr):
+            referencias.append(dp.run()[1] if dp.is_tractable() else None)
+    return referencias
+
+
+def score(resultados, referencias, mejores, calidad_minima):
+    """
+    (calidad, tiempo, clave) de una configuración. calidad es el valor medio relativo a la
+    referencia de cada instancia (óptimo de DP o el mejor valor visto) y tiempo el CPU medio por
+    ejecución. Entre las que alcanzan calidad_minima gana la mayor calidad por segundo de CPU;
+    las que no la alcanzan quedan detrás, ordenadas por calidad.
+    """
+    calidades = [valor / (referencias[i] or mejores[i]) if (referencias[i] or mejores[i]) else 0.0
+                 for i, valor, _ in resultados]
+    calidad = float(np.mean(calidades))
+    tiempo = float(np.mean([t for _, _, t in resultados]))
+    if calidad >= calidad_minima:
+        return calidad, tiempo, (1, calidad / max(tiempo, 1e-6))
+    return calidad, tiempo, (0, calidad)
+
+
+def successive_halving(algoritmo, instancias, n_configs=27, eta=3, min_runs=None, max_runs=None,
+                       procesos=None, semilla=0, calidad_minima=0.98):
+    """
+    Búsqueda por successive halving: muestrea n_configs configuraciones (la primera es la de
+    DEFAULT_PARAMS), evalúa todas con min_runs ejecuciones (instancia, semilla), conserva la
+    mejor fracción 1/eta y multiplica por eta las ejecuciones de las sobrevivientes hasta quedar
+    una. Cada ejecución corre en el pool de procesos; los resultados de rondas anteriores se
+    reutilizan. Devuelve un diccionario con la mejor configuración, sus métricas y el historial.
+    """
+    generator = np.random.default_rng(semilla)
+    space = PARAM_SPACES[algoritmo]
+    base = {k: v for k, v in DEFAULT_PARAMS[algoritmo].items() if k in space}
+    configs = [base] + [sample_config(space, generator) for _ in range(n_configs - 1)]
+    configs = [{**DEFAULT_PARAMS[algoritmo], **c} for c in configs]
+
+    min_runs = min_runs or len(instancias)
+    rungs = max(int(math.ceil(math.log(n_configs, eta))), 1)
+    max_runs = max_runs or min_runs * eta ** rungs
+    # Orden fijo de ejecuciones: todas las instancias con la semilla 0, luego con la 1, ...
+    ejecuciones = [(i, semilla + s) for s in range(math.ceil(max_runs / len(instancias)))
+                   for i in range(len(instancias))][:max_runs]
+
+    referencias = reference_values(instancias)
+    mejores = [0.0] * len(instancias)
+    resultados = {c: [] for c in range(len(configs))}
+    vivas = list(range(len(configs)))
+    historial = []
+    runs = min_runs
+
+    procesos = procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=procesos, initializer=iniciar_worker,
+                             initargs=({"instancias": instancias, "algoritmo": algoritmo},)) as pool:
+        while True:
+            pendientes = [(c, i, s) for c in vivas for i, s in ejecuciones[len(resultados[c]):runs]]
+            for c, i, s, valor, tiempo in pool.map(_evaluar, [p[0] for p in pendientes],
+                                                   [configs[p[0]] for p in pendientes],
+                                                   [p[1] for p in pendientes], [p[2] for p in pendientes]):
+                resultados[c].append((i, valor, tiempo))
+                mejores[i] = max(mejores[i], valor)
+
+            puntajes = {c: score(resultados[c], referencias, mejores, calidad_minima) for c in vivas}
+            vivas.sort(key=lambda c: puntajes[c][2], reverse=True)
+            historial.append({"ejecuciones": runs, "configuraciones": [
+                {"indice": c, "calidad": puntajes[c][0], "tiempo": puntajes[c][1]} for c in vivas]})
+            print(f"Ronda con {len(vivas)} configuraciones x {runs} ejecuciones: mejor calidad "
+                  f"{puntajes[vivas[0]][0]:.4f} en {puntajes[vivas[0]][1]:.4f}s", file=sys.stderr)
+
+            if len(vivas) == 1 or runs >= len(ejecuciones):
+                break
+            vivas = vivas[:max(len(vivas) // eta, 1)]
+            runs = min(runs * eta, len(ejecuciones))
+
+    mejor = vivas[0]
+    calidad, tiempo, _ = score(resultados[mejor], referencias, mejores, calidad_minima)
+    base_calidad, base_tiempo, _ = score(resultados[0], referencias, mejores, calidad_minima)
+    return {
+        "algoritmo": algoritmo,
+        "params": configs[mejor],
+        "calidad": calidad,
+        "tiempo": tiempo,
+        "base": {"params": configs[0], "calidad": base_calidad, "tiempo": base_tiempo,
+                 "ejecuciones": len(resultados[0])},
+        "historial": historial,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ajuste de hiperparámetros de SA/ACO por successive halving.")
+    parser.add_argument("instancias", nargs="*", help="Archivos Excel de entrenamiento (además de los sintéticos)")
+    parser.add_argument("--tamanos", nargs="*", type=int, default=[30, 60], help="n_items de las instancias sintéticas")
+    parser.add_argument("--capacidad", type=float, default=0.3, help="Capacidad como fracción del peso total")
+    parser.add_argument("-a", "--algoritmos", nargs="+", choices=sorted(PARAM_SPACES), default=["sa", "aco"])
+    parser.add_argument("--configuraciones", type=int, default=27, help="Configuraciones muestreadas por algoritmo")
+    parser.add_argument("--eta", type=int, default=3, help="Factor de reducción por ronda")
+    parser.add_argument("--min-ejecuciones", type=int, default=None,
+                        help="Ejecuciones por configuración en la primera ronda (por defecto, una por instancia)")
+    parser.add_argument("--calidad-minima", type=float, default=0.98,
+                        help="Calidad relativa mínima para competir por calidad por segundo")
+    parser.add_argument("-p", "--procesos", type=int, default=None)
+    parser.add_argument("-s", "--semilla", type=int, default=0)
+    parser.add_argument("-o", "--salida", default="mejor_config.json",
+                        help="JSON de configuraciones (formato de main.py -c)")
+    args = parser.parse_args(argv)
+
+    instancias = [generate_instance(n, capacity_ratio=args.capacidad, correlated=corr, seed=args.semilla + n)
+                  for n in args.tamanos for corr in (False, True)]
+    for ruta in args.instancias:
+        with contextlib.redirect_stdout(sys.stderr):
+            data = load_data(ruta, interactive=False)
+        if data is not None:
+            instancias.append(data)
+
+    resultados = []
+    for algoritmo in args.algoritmos:
+        r = successive_halving(algoritmo, instancias, args.configuraciones, args.eta, args.min_ejecuciones,
+                               procesos=args.procesos, semilla=args.semilla, calidad_minima=args.calidad_minima)
+        print(f"{algoritmo}: calidad {r['calidad']:.4f} en {r['tiempo']:.4f}s por ejecución "
+              f"(por defecto: {r['base']['calidad']:.4f} en {r['base']['tiempo']:.4f}s)", file=sys.stderr)
+        resultados.append(r)
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2)
+    print(f"Configuraciones guardadas en {args.salida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
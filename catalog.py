@@ -0,0 +1,144 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from construction import ratio_order
+from solvers import build_solver, sembrar, iniciar_worker, worker_state
+from checkpoint import check_parallel_path
+
+
+class Catalog:
+    """
+    Catálogo de ítems compilado una sola vez para resolver muchas instancias que solo difieren
+    en la capacidad o en el subconjunto de ítems. Guarda los arreglos NumPy, el orden por razón
+    valor/peso, la tabla heurística del ACO y la descomposición binaria de la DP; instance()
+    devuelve el diccionario de set_problem_data con esas piezas ya calculadas en "compiled".
+    """
+
+    def __init__(self, data):
+        self.weights = list(data["weights"])
+        self.values = list(data["values"])
+        self.quantities = list(data["quantities"])
+        self.max_weight = data.get("max_weight")
+        self.n_items = len(self.weights)
+
+        self.weight_array = np.asarray(self.weights, dtype=float)
+        self.value_array = np.asarray(self.values, dtype=float)
+        self.quantity_array = np.asarray(self.quantities, dtype=int)
+        self.order = np.asarray(ratio_order(self.weights, self.values), dtype=int)
+
+        max_quantity = int(self.quantity_array.max()) if self.n_items else 0
+        width = max_quantity + 1
+        self.valid_mask = np.arange(width)[None, :] <= self.quantity_array[:, None]
+        ratio = self.value_array / self.weight_array
+        self.heuristic = np.where(self.valid_mask, ratio[:, None], 0.0)
+        self.heuristic[:, 0] = 0.01
+
+        # Partes 1, 2, 4, ..., resto de cada ítem, vectorizado sobre todo el catálogo
+        powers = 2 ** np.arange(max(max_quantity, 1).bit_length())
+        starts = np.cumsum(powers) - powers
+        counts = np.clip(self.quantity_array[:, None] - starts[None, :], 0, powers[None, :])
+        items, cols = np.nonzero(counts)
+        self.part_items = items
+        self.part_counts = counts[items, cols]
+
+    def instance(self, max_weight=None, items=None):
+        """
+        Instancia con capacidad max_weight (por defecto la del catálogo) restringida a los índices
+        items (por defecto todos). Las listas y tablas del catálogo completo se comparten sin copiar.
+        """
+        if max_weight is None:
+            max_weight = self.max_weight
+        if items is None:
+            return {
+                "weights": self.weights, "values": self.values, "quantities": self.quantities,
+                "max_weight": max_weight, "n_items": self.n_items,
+                "compiled": {
+                    "weight_array": self.weight_array, "value_array": self.value_array,
+                    "quantity_array": self.quantity_array, "order": self.order.tolist(),
+                    "valid_mask": self.valid_mask, "heuristic": self.heuristic,
+                    "part_items": self.part_items, "part_counts": self.part_counts,
+                },
+            }
+
+        items = np.asarray(items, dtype=int)
+        # Posición de cada ítem del catálogo dentro del subconjunto (-1 si no está)
+        position = np.full(self.n_items, -1)
+        position[items] = np.arange(len(items))
+        quantity_array = self.quantity_array[items]
+        width = int(quantity_array.max()) + 1 if len(items) else 1
+        order = position[self.order]
+        parts = position[self.part_items] >= 0
+        return {
+            "weights": self.weight_array[items].tolist(), "values": self.value_array[items].tolist(),
+            "quantities": quantity_array.tolist(), "max_weight": max_weight, "n_items": len(items),
+            "compiled": {
+                "weight_array": self.weight_array[items], "value_array": self.value_array[items],
+                "quantity_array": quantity_array, "order": order[order >= 0].tolist(),
+                "valid_mask": self.valid_mask[items, :width], "heuristic": self.heuristic[items, :width],
+                "part_items": position[self.part_items[parts]], "part_counts": self.part_counts[parts],
+            },
+        }
+
+
+def _resolver(indice, max_weight, items, semilla):
+    catalogo = worker_state["catalogo"]
+    solver = worker_state["solver"]
+    solver.set_problem_data(catalogo.instance(max_weight, items))
+    sembrar(solver, semilla)
+    start = time.perf_counter()
+    solucion, valor, iter_conv, _ = solver.run()
+    tiempo = time.perf_counter() - start
+
+    # La solución se devuelve con los índices del catálogo completo
+    completa = np.zeros(catalogo.n_items, dtype=int)
+    if solucion is not None:
+        completa[slice(None) if items is None else items] = solucion
+    return {
+        "indice": indice,
+        "capacidad": max_weight,
+        "valor": valor,
+        "peso": float(completa @ catalogo.weight_array),
+        "iter_convergencia": iter_conv,
+        "iteraciones": solver.iterations,
+        "parada": solver.stop_reason,
+        "tiempo": tiempo,
+        "solucion": completa.tolist(),
+    }
+
+
+def solve_many(catalogo, capacidades=None, subconjuntos=None, algoritmo="aco", params=None,
+               procesos=None, semilla=0):
+    """
+    Resuelve una instancia por cada capacidad (y subconjunto de ítems, si se indica) contra un
+    Catalog compilado. Con una sola lista se usa la capacidad o el catálogo completo para el otro
+    eje; si se dan ambas deben tener la misma longitud. El catálogo y el solver se envían una vez
+    por proceso; la instancia i usa la semilla semilla + i. Devuelve los resultados en orden.
+    """
+    params = params or {}
+    if capacidades is None and subconjuntos is None:
+        capacidades = [catalogo.max_weight]
+    if capacidades is None:
+        capacidades = [catalogo.max_weight] * len(subconjuntos)
+    if subconjuntos is None:
+        subconjuntos = [None] * len(capacidades)
+    if len(capacidades) != len(subconjuntos):
+        raise ValueError("capacidades y subconjuntos deben tener la misma longitud")
+
+    n = len(capacidades)
+    semillas = [None if semilla is None else semilla + i for i in range(n)]
+    procesos = min(procesos or os.cpu_count() or 1, n)
+    estado = {"catalogo": catalogo, "solver": build_solver(algoritmo, params)}
+    check_parallel_path(estado["solver"])
+    if procesos <= 1:
+        iniciar_worker(estado)
+        return [_resolver(i, capacidades[i], subconjuntos[i], semillas[i]) for i in range(n)]
+
+    resultados = [None] * n
+    with ProcessPoolExecutor(max_workers=procesos, initializer=iniciar_worker,
+                             initargs=(estado,)) as pool:
+        futuros = [pool.submit(_resolver, i, capacidades[i], subconjuntos[i], semillas[i]) for i in range(n)]
+        for futuro in as_completed(futuros):
+            resultado = futuro.result()
+            resultados[resultado["indice"]] = resultado
+    return resultados
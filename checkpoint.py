@@ -0,0 +1,108 @@
+import os
+import json
+import tempfile
+import numpy as np
+from random_stream import RandomStream
+from telemetry import ConvergenceTrace
+
+FORMAT_VERSION = 3
+
+
+def checkpoint_file(path, solver):
+    """Ruta del checkpoint de solver: path con {pid} y {seed} reemplazados por el proceso y la semilla."""
+    return path.format(pid=os.getpid(), seed=solver.seed)
+
+
+def check_parallel_path(solver):
+    """
+    Lanza ValueError si solver guarda checkpoints en una ruta que compartirían las ejecuciones de
+    un pool; con {seed} cada repetición tiene su propio archivo y puede retomarse con su semilla.
+    """
+    path = getattr(solver, "checkpoint_path", None)
+    if path and "{seed}" not in path:
+        raise ValueError(f"checkpoint_path debe contener {{seed}} para ejecuciones en paralelo: {path}")
+
+
+def save_checkpoint(path, meta, **arrays):
+    """
+    Escribe un checkpoint .npz (metadatos JSON + arreglos) de forma atómica: un archivo temporal
+    propio en el mismo directorio, renombrado al terminar.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps({"version": FORMAT_VERSION, **meta})), **arrays)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def load_checkpoint(path, solver=None):
+    """Devuelve (meta, arreglos) de un checkpoint; solver ("sa"/"aco") valida su origen."""
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        arrays = {name: data[name] for name in data.files if name != "meta"}
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Versión de checkpoint no soportada: {meta.get('version')}")
+    if solver is not None and meta["solver"] != solver:
+        raise ValueError(f"El checkpoint {path} es de {meta['solver']}, no de {solver}")
+    return meta, arrays
+
+
+def save_solver_state(path, solver, name, iteration, elapsed, **state):
+    """
+    Guarda el estado común de un solver (mejor solución, historial, generador aleatorio, iteración y
+    tiempo) más los valores propios del algoritmo en state: arreglos NumPy o escalares JSON.
+    Del flujo aleatorio se guarda su posición (RandomStream.get_state) en los metadatos, nunca un
+    pickle; guardar no altera la ejecución y la reanudada consume los mismos números que la original.
+    """
+    iterations, values = solver.fitness_history.points()
+    meta = {
+        "solver": name,
+        "n_items": solver.problem.n_items,
+        "iteration": iteration,
+        "elapsed": elapsed,
+        "best_value": float(solver.best_value),
+        "convergence_iter": int(solver.convergence_iter),
+        "trace_stride": solver.fitness_history.stride,
+        "trace_count": solver.fitness_history.count,
+        "trace_tail": solver.fitness_history.tail,
+        "rng_state": solver.rng.get_state(),
+    }
+    arrays = {
+        "best_solution": np.asarray([] if solver.best_solution is None else solver.best_solution, dtype=np.int64),
+        "trace_iterations": iterations,
+        "trace_values": values,
+    }
+    for key, value in state.items():
+        if isinstance(value, np.ndarray):
+            arrays[key] = value
+        else:
+            meta[key] = value
+    save_checkpoint(path, meta, **arrays)
+
+
+def restore_solver_state(path, solver, name):
+    """Restaura el estado común guardado por save_solver_state; devuelve (meta, arreglos)."""
+    meta, arrays = load_checkpoint(path, name)
+    if meta["n_items"] != solver.problem.n_items:
+        raise ValueError(f"El checkpoint es de un problema con {meta['n_items']} ítems, no {solver.problem.n_items}")
+
+    solver.rng = RandomStream.from_state(meta["rng_state"])
+    solver.best_value = meta["best_value"]
+    solver.best_solution = solver.problem.solution(arrays["best_solution"]) if len(arrays["best_solution"]) else None
+    solver.convergence_iter = meta["convergence_iter"]
+
+    # El último punto guardado puede ser el provisional (fuera del paso de muestreo)
+    end = len(arrays["trace_values"])
+    tail = meta["trace_tail"]
+    trace = ConvergenceTrace(max(solver.history_size, end - tail))
+    trace.iterations[:end] = arrays["trace_iterations"]
+    trace.values[:end] = arrays["trace_values"]
+    trace.size = end - tail
+    trace.tail = tail
+    trace.stride = meta["trace_stride"]
+    trace.count = meta["trace_count"]
+    solver.fitness_history = trace
+    return meta, arrays
@@ -0,0 +1,55 @@
+import math
+import numpy as np
+
+
+def ratio_order(weights, values):
+    """Índices ordenados por valor/peso de mayor a menor (desempate estable por índice)."""
+    ratio = np.asarray(values, dtype=float) / np.asarray(weights, dtype=float)
+    return np.argsort(-ratio, kind="stable").tolist()
+
+
+def greedy_solution(weights, values, quantities, max_weight, order=None):
+    """Llena la mochila con tantas unidades como quepan de cada ítem, en orden de mejor razón."""
+    if order is None:
+        order = ratio_order(weights, values)
+    solution = [0] * len(weights)
+    remaining = max_weight
+    for i in order:
+        take = min(quantities[i], int(remaining / weights[i]))
+        if take > 0:
+            solution[i] = take
+            remaining -= take * weights[i]
+    return solution
+
+
+def randomized_greedy_solution(weights, values, quantities, max_weight, generator, noise=0.3):
+    """
+    Greedy sobre razones perturbadas multiplicativamente por un factor en [1 - noise, 1 + noise];
+    con noise=0 coincide con greedy_solution. generator es un numpy.random.Generator.
+    """
+    ratio = np.asarray(values, dtype=float) / np.asarray(weights, dtype=float)
+    ratio = ratio * generator.uniform(1 - noise, 1 + noise, len(ratio))
+    order = np.argsort(-ratio, kind="stable").tolist()
+    return greedy_solution(weights, values, quantities, max_weight, order)
+
+
+def repair_worst_ratio(solution, weights, max_weight, current_weight, worst_first, protect=None):
+    """
+    Quita in situ unidades de los ítems con peor razón valor/peso hasta respetar la capacidad.
+    worst_first es ratio_order invertido; el ítem protect (p. ej. el recién agregado) solo se
+    toca si no basta con los demás. Devuelve (cambios [(índice, -unidades)], peso resultante).
+    """
+    moves = []
+    for allow_protected in (False, True):
+        for i in worst_first:
+            if current_weight <= max_weight:
+                return moves, current_weight
+            if solution[i] == 0 or (i == protect) != allow_protected:
+                continue
+            # Unidades necesarias para volver a la capacidad, sin quitar más de las que hay
+            need = math.ceil((current_weight - max_weight) / weights[i])
+            take = min(solution[i], need)
+            solution[i] -= take
+            current_weight -= take * weights[i]
+            moves.append((i, -take))
+    return moves, current_weight
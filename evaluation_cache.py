@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+
+class EvaluationCache:
+    """
+    Caché LRU de (valor, peso) por vector de cantidades, con capacidad acotada.
+    La clave es la tupla de cantidades (listas) o los bytes de la fila (arreglos NumPy), así que
+    no hay colisiones; al superar `capacity` entradas se descarta la usada hace más tiempo.
+    """
+
+    def __init__(self, evaluate, capacity=4096):
+        # evaluate(solución) -> (valor, peso), p. ej. KnapsackProblem.evaluate
+        self.evaluate_solution = evaluate
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(solution):
+        return tuple(solution) if isinstance(solution, list) else solution.tobytes()
+
+    def evaluate(self, solution):
+        """Devuelve (valor, peso) de la solución, calculándolos solo si no están en caché."""
+        key = self.key(solution)
+        result = self.entries.get(key)
+        if result is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return result
+
+        self.misses += 1
+        result = self.evaluate_solution(solution)
+        self.entries[key] = result
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,6 +1,10 @@
 import os
 import glob
-import pandas as pd
+import hashlib
+import tempfile
+import zipfile
+import numpy as np
+from problem import KnapsackProblem
 
 def find_excel():
     """Busca automáticamente un archivo .xlsx."""
@@ -10,28 +14,100 @@ def find_excel():
         return archivos[0]
     raise FileNotFoundError("No se encontró ningún archivo .xlsx en la carpeta actual.")
 
-def load_data(file_path, max_weight=None):
+def ask(prompt, interactive=True):
+    """Pide un dato por consola; en modo no interactivo falla en lugar de bloquear."""
+    if not interactive:
+        raise ValueError(f"Falta un dato en modo no interactivo: {prompt.strip(': ')}")
+    return input(prompt)
+
+def cache_path(file_path):
+    """Ruta del caché binario que acompaña al Excel."""
+    return os.path.splitext(file_path)[0] + ".cache.npz"
+
+def file_hash(file_path):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def read_excel_arrays(file_path, interactive=True):
+    """Lee pesos, valores y cantidades del Excel con pandas (solo se importa aquí)."""
+    import pandas as pd
+
+    df = pd.read_excel(file_path)
+    print("Columnas encontradas:", df.columns.tolist())
+
+    # Detecta columnas o solicita nombres
+    weight_col = ('Peso_kg' if 'Peso_kg' in df.columns else
+                  'Peso (kg)' if 'Peso (kg)' in df.columns else
+                  ask("Columna de pesos: ", interactive))
+    value_col = ('Valor' if 'Valor' in df.columns else
+                 'Valor ($)' if 'Valor ($)' in df.columns else
+                 ask("Columna de valores: ", interactive))
+    qty_col = ('Cantidad' if 'Cantidad' in df.columns else
+               ask("Columna de cantidades: ", interactive))
+
+    return (df[weight_col].to_numpy(dtype=float),
+            df[value_col].to_numpy(dtype=float),
+            df[qty_col].to_numpy(dtype=int))
+
+def write_cache(path, **arrays):
+    """
+    Escribe el caché .npz en un archivo temporal propio del mismo directorio y lo renombra:
+    una carga concurrente ve el caché anterior o el nuevo, nunca uno a medias.
+    """
+    tmp = None
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+    except OSError as e:
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+        print(f"No se pudo escribir el caché {path}: {e}")
+
+def load_arrays(file_path, use_cache=True, interactive=True):
+    """
+    Devuelve (weights, values, quantities) como arreglos NumPy.
+    El primer uso escribe un caché .npz junto al Excel, identificado por fecha de
+    modificación, tamaño y hash del archivo; los siguientes lo leen sin pasar por pandas/openpyxl.
+    Si la fecha o el tamaño no coinciden, el hash decide si el contenido sigue siendo el mismo.
+    """
+    if not use_cache:
+        return read_excel_arrays(file_path, interactive)
+
+    path = cache_path(file_path)
+    stat = os.stat(file_path)
+    digest = None
+    cached = None
+    if os.path.exists(path):
+        try:
+            with np.load(path) as cache:
+                cached = cache["weights"], cache["values"], cache["quantities"]
+                if (float(cache["mtime"]) == stat.st_mtime and "size" in cache.files
+                        and int(cache["size"]) == stat.st_size):
+                    return cached
+                digest = file_hash(file_path)
+                if str(cache["sha256"]) != digest:
+                    cached = None
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            # Caché ilegible: se vuelve a leer el Excel y se reescribe
+            cached = None
+
+    weights, values, quantities = cached if cached is not None else read_excel_arrays(file_path, interactive)
+    write_cache(path, weights=weights, values=values, quantities=quantities,
+                mtime=stat.st_mtime, size=stat.st_size, sha256=digest or file_hash(file_path))
+    return weights, values, quantities
+
+def load_problem(file_path, max_weight=None, use_cache=True, interactive=True):
     """
-    Carga datos del Excel encontrado.
-    Devuelve un diccionario (los datos del excel).
+    Carga datos del Excel encontrado (o de su caché binario) como KnapsackProblem.
+    Con interactive=False nunca usa input(): si falta una columna o la capacidad, devuelve None.
     """
     try:
-        df = pd.read_excel(file_path)
-        print("Columnas encontradas:", df.columns.tolist())
-
-        # Detecta columnas o solicita nombres
-        weight_col = ('Peso_kg' if 'Peso_kg' in df.columns else
-                      'Peso (kg)' if 'Peso (kg)' in df.columns else
-                      input("Columna de pesos: "))
-        value_col = ('Valor' if 'Valor' in df.columns else
-                     'Valor ($)' if 'Valor ($)' in df.columns else
-                     input("Columna de valores: "))
-        qty_col = ('Cantidad' if 'Cantidad' in df.columns else
-                   input("Columna de cantidades: "))
-
-        weights = df[weight_col].astype(float).tolist()
-        values = df[value_col].astype(float).tolist()
-        quantities = df[qty_col].astype(int).tolist()
+        weights, values, quantities = load_arrays(file_path, use_cache, interactive)
         n_items = len(weights)
 
         # Capacidad máxima de la mochila
@@ -43,21 +119,21 @@ def load_data(file_path, max_weight=None):
                     w_str = parts[1].split("kg")[0]
                     max_weight = float(w_str)
                     print(f"Capacidad extraída: {max_weight} kg")
-                except:
-                    max_weight = float(input("Ingrese la capacidad máxima (kg): "))
+                except (IndexError, ValueError):
+                    max_weight = float(ask("Ingrese la capacidad máxima (kg): ", interactive))
             else:
-                max_weight = float(input("Ingrese la capacidad máxima (kg): "))
+                max_weight = float(ask("Ingrese la capacidad máxima (kg): ", interactive))
 
         print(f"Datos cargados: {n_items} objetos, capacidad {max_weight} kg")
-
-        return {
-            "weights": weights,
-            "values": values,
-            "quantities": quantities,
-            "max_weight": max_weight,
-            "n_items": n_items
-        }
+        return KnapsackProblem(weights, values, quantities, max_weight)
 
     except Exception as e:
         print(f"Error al cargar datos: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def load_data(file_path, max_weight=None, use_cache=True, interactive=True):
+    """
+    Igual que load_problem, pero devuelve el diccionario de set_problem_data (los datos del excel).
+    """
+    problem = load_problem(file_path, max_weight, use_cache, interactive)
+    return problem.to_data() if problem is not None else None
\ No newline at end of file
@@ -0,0 +1,76 @@
+import io
+import time
+import cProfile
+import pstats
+
+
+class Instrumentation:
+    """
+    Contadores, temporizadores y eventos por iteración para los solvers (opcional).
+    Se pasa como instrumentation=Instrumentation() al crear el solver; sin ella los
+    solvers no miden nada.
+    """
+
+    def __init__(self, callback=None):
+        # callback(evento) se llama al final de cada iteración con un diccionario
+        self.callback = callback
+        self.counters = {}
+        self.timers = {}
+        self.calls = {}
+        self.profiler = None
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+        self.calls.clear()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def start(self):
+        return time.perf_counter()
+
+    def stop(self, name, start):
+        """Acumula el tiempo desde start en el temporizador name y devuelve el instante actual."""
+        now = time.perf_counter()
+        self.timers[name] = self.timers.get(name, 0.0) + (now - start)
+        self.calls[name] = self.calls.get(name, 0) + 1
+        return now
+
+    def iteration(self, **event):
+        if self.callback is not None:
+            self.callback(event)
+
+    def stats(self):
+        """Exporta contadores y temporizadores como diccionario (apto para JSON)."""
+        return {
+            "counters": dict(self.counters),
+            "timers": {
+                name: {"total": total, "calls": self.calls[name], "mean": total / self.calls[name]}
+                for name, total in self.timers.items()
+            },
+        }
+
+    def profile(self, func, *args, **kwargs):
+        """Ejecuta func bajo cProfile; el perfil queda disponible para report()/dump_stats()."""
+        self.profiler = cProfile.Profile()
+        try:
+            return self.profiler.runcall(func, *args, **kwargs)
+        finally:
+            self.profiler.create_stats()
+
+    def report(self, sort="cumulative", limit=20):
+        """Texto con los temporizadores y, si se perfiló, las funciones más costosas según pstats."""
+        out = io.StringIO()
+        out.write("--- Instrumentación ---\n")
+        for name, value in sorted(self.counters.items()):
+            out.write(f"{name}: {value}\n")
+        for name, total in sorted(self.timers.items(), key=lambda x: -x[1]):
+            out.write(f"{name}: {total:.4f}s en {self.calls[name]} llamadas\n")
+        if self.profiler is not None:
+            pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump_stats(self, path):
+        """Guarda el perfil en formato pstats (p. ej. para snakeviz o pstats.Stats(path))."""
+        self.profiler.dump_stats(path)
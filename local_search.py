@@ -0,0 +1,72 @@
+from construction import ratio_order
+
+
+class LocalSearch:
+    """
+    Búsqueda local para mejorar soluciones de la mochila con actualizaciones incrementales.
+    moves admite "fill" (llena la capacidad sobrante por razón valor/peso) y "swap" (quita una
+    unidad de un ítem y rellena con otros si el valor total mejora). top_k es cuántas de las
+    mejores soluciones de cada iteración mejora el solver; max_passes acota las pasadas de swap.
+    """
+
+    def __init__(self, moves=("fill", "swap"), top_k=5, max_passes=2):
+        self.moves = tuple(moves)
+        self.top_k = top_k
+        self.max_passes = max_passes
+        self.weights = []
+        self.values = []
+        self.quantities = []
+        self.max_weight = 0
+        self.best_first = []
+
+    def setup(self, data):
+        """Precalcula el orden por razón valor/peso para el problema dado."""
+        self.weights = list(data["weights"])
+        self.values = list(data["values"])
+        self.quantities = list(data["quantities"])
+        self.max_weight = data["max_weight"]
+        compiled = data.get("compiled")
+        self.best_first = compiled["order"] if compiled else ratio_order(self.weights, self.values)
+
+    def fill(self, solution, weight, value, skip=None):
+        """Agrega unidades en orden de mejor razón mientras quepan; devuelve (peso, valor, cambios)."""
+        moves = []
+        for i in self.best_first:
+            if i == skip or solution[i] >= self.quantities[i]:
+                continue
+            take = min(self.quantities[i] - solution[i], int((self.max_weight - weight) / self.weights[i]))
+            if take > 0:
+                solution[i] += take
+                weight += take * self.weights[i]
+                value += take * self.values[i]
+                moves.append((i, take))
+        return weight, value, moves
+
+    def swap(self, solution, weight, value):
+        """Quita una unidad de cada ítem usado (peor razón primero) y rellena; conserva solo mejoras."""
+        for _ in range(self.max_passes):
+            improved = False
+            for i in reversed(self.best_first):
+                if solution[i] == 0:
+                    continue
+                solution[i] -= 1
+                new_weight, new_value, moves = self.fill(solution, weight - self.weights[i],
+                                                         value - self.values[i], skip=i)
+                if new_value > value:
+                    weight, value = new_weight, new_value
+                    improved = True
+                else:
+                    for j, take in moves:
+                        solution[j] -= take
+                    solution[i] += 1
+            if not improved:
+                break
+        return weight, value
+
+    def improve(self, solution, weight, value):
+        """Mejora la solución in situ y devuelve (peso, valor)."""
+        if "fill" in self.moves:
+            weight, value, _ = self.fill(solution, weight, value)
+        if "swap" in self.moves:
+            weight, value = self.swap(solution, weight, value)
+        return weight, value
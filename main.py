@@ -1,11 +1,98 @@
 import os
+import sys
+import json
+import argparse
+import contextlib
 import statistics
 from excel_reader import find_excel, load_data
 from SimulatedAnnealing import KnapsackSimulatedAnnealing
 from AntColony import KnapsackAntColony
+from DynamicProgramming import KnapsackDynamicProgramming
 from AnalisisDesempeno import ejecutar_varias_veces_sa, ejecutar_varias_veces_aco
+from solvers import SOLVERS, DEFAULT_PARAMS, build_solver, load_configs, sembrar
+from reporting import StudyReport
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Problema de la mochila con SA, ACO y DP. Sin instancias se abre el menú interactivo.")
+    parser.add_argument("instancias", nargs="*",
+                        help="Archivos Excel a resolver en modo batch (sin preguntas ni gráficos)")
+    parser.add_argument("-a", "--algoritmos", nargs="+", choices=sorted(SOLVERS), default=["sa", "aco"],
+                        help="Algoritmos a ejecutar con sus parámetros por defecto")
+    parser.add_argument("-c", "--config",
+                        help='JSON con una lista de configuraciones [{"algoritmo": "sa", "params": {...}}, ...]; '
+                             "reemplaza a --algoritmos")
+    parser.add_argument("-n", "--repeticiones", type=int, default=1, help="Ejecuciones por instancia y configuración")
+    parser.add_argument("-s", "--semilla", type=int, default=None,
+                        help="Semilla base; la repetición i usa semilla + i")
+    parser.add_argument("--capacidad", type=float, default=None,
+                        help="Capacidad máxima (kg); por defecto se extrae del nombre del archivo")
+    parser.add_argument("-o", "--salida", default="-", help="Archivo JSON lines de resultados ('-' = stdout)")
+    parser.add_argument("-g", "--graficos", default=None,
+                        help="Carpeta donde guardar la convergencia de cada ejecución (se generan al final)")
+    return parser.parse_args(argv)
+
+def run_batch(args):
+    """
+    Ejecuta todas las combinaciones instancia x configuración x repetición sin interacción.
+    Cada resultado se escribe como una línea JSON en cuanto termina; los mensajes de los
+    solvers se desvían a stderr para no mezclarse con la salida.
+    """
+    configs = load_configs(args.config, args.algoritmos)
+    reporte = StudyReport() if args.graficos else None
+    if reporte:
+        os.makedirs(args.graficos, exist_ok=True)
+    out = sys.stdout if args.salida == "-" else open(args.salida, "a", encoding="utf-8")
+    try:
+        for path in args.instancias:
+            with contextlib.redirect_stdout(sys.stderr):
+                data = load_data(path, max_weight=args.capacidad, interactive=False)
+            if not data:
+                out.write(json.dumps({"instancia": path, "error": "no se pudieron cargar los datos"}) + "\n")
+                out.flush()
+                continue
+
+            for algoritmo, params in configs:
+                solver = build_solver(algoritmo, params)
+                solver.set_problem_data(data)
+                for rep in range(args.repeticiones):
+                    semilla = None if args.semilla is None else args.semilla + rep
+                    record = {"instancia": path, "algoritmo": algoritmo, "params": params,
+                              "repeticion": rep, "semilla": semilla}
+                    try:
+                        sembrar(solver, semilla)
+                        with contextlib.redirect_stdout(sys.stderr):
+                            sol, valor, iter_conv, tiempo = solver.run()
+                        if sol is None:
+                            # Ninguna solución con valor positivo (p. ej. ningún ítem cabe): mochila vacía
+                            sol = solver.problem.solution()
+                        record.update({"valor": valor, "peso": solver.calculate_weight(sol),
+                                       "iter_convergencia": iter_conv, "iteraciones": solver.iterations,
+                                       "parada": solver.stop_reason,
+                                       "tiempo": tiempo, "solucion": [int(q) for q in sol]})
+                    except Exception as e:
+                        record["error"] = str(e)
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    if reporte and "error" not in record and algoritmo != "dp":
+                        nombre = os.path.splitext(os.path.basename(path))[0]
+                        reporte.add_convergence(os.path.join(args.graficos, f"{nombre}_{algoritmo}_{rep}.png"),
+                                                solver.fitness_history, f"Convergencia {algoritmo.upper()} - {nombre}")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    # Todas las figuras se generan juntas, después de los cálculos
+    if reporte:
+        with contextlib.redirect_stdout(sys.stderr):
+            print(f"Gráficos guardados: {len(reporte.render())}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.instancias:
+        run_batch(args)
+        return
 
-def main():
     # Buscar archivo Excel
     try:
         path = find_excel()
@@ -27,17 +114,24 @@ def main():
     print("1. Enfriamiento Simulado (SA)")
     print("2. Colonia de Hormigas (ACO)")
     print("3. Ambos algoritmos")
+    print("4. Programación Dinámica (óptimo exacto)")
     
-    opcion = input("Ingrese su opción (1-3): ")
+    opcion = input("Ingrese su opción (1-4): ")
+
+    # Óptimo exacto como referencia cuando la instancia es suficientemente pequeña
+    dp = KnapsackDynamicProgramming()
+    dp.set_problem_data(data)
+    optimo = dp.run()[1] if dp.is_tractable() else None
+
+    if opcion == '4':
+        if optimo is None:
+            print("La instancia es demasiado grande para programación dinámica.")
+        else:
+            dp.print_results()
     
     if opcion in ['1', '3']:
         print("\nEjecutando Enfriamiento Simulado...")
-        sa = KnapsackSimulatedAnnealing(
-            initial_temp=1000,
-            final_temp=1,
-            cooling_rate=0.95,
-            max_iterations=1000
-        )
+        sa = KnapsackSimulatedAnnealing(**DEFAULT_PARAMS["sa"])
         sa.set_problem_data(data)
         sa.run()
         sa.print_results()
@@ -46,18 +140,11 @@ def main():
         ejecutar_multiple = input("\n¿Desea ejecutar múltiples veces para obtener estadísticas? (s/n): ")
         if ejecutar_multiple.lower() == 's':
             veces = int(input("Número de ejecuciones: "))
-            ejecutar_varias_veces_sa(sa, veces)
+            ejecutar_varias_veces_sa(sa, veces, optimo=optimo)
     
     if opcion in ['2', '3']:
         print("\nEjecutando Colonia de Hormigas...")
-        aco = KnapsackAntColony(
-            ant_count=50,
-            max_iterations=200,
-            alpha=1.0,
-            beta=2.0,
-            evaporation_rate=0.5,
-            q=100
-        )
+        aco = KnapsackAntColony(**DEFAULT_PARAMS["aco"])
         aco.set_problem_data(data)
         aco.run()
         aco.print_results()
@@ -66,7 +153,7 @@ def main():
         ejecutar_multiple = input("\n¿Desea ejecutar múltiples veces para obtener estadísticas? (s/n): ")
         if ejecutar_multiple.lower() == 's':
             veces = int(input("Número de ejecuciones: "))
-            ejecutar_varias_veces_aco(aco, veces)
+            ejecutar_varias_veces_aco(aco, veces, optimo=optimo)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class KnapsackProblem:
+    """
+    Datos del problema en arreglos NumPy contiguos. Las cantidades (y las soluciones) usan el
+    entero sin signo más pequeño que cabe (uint8 hasta 255 unidades por ítem); pesos y valores
+    quedan en float64 porque la factibilidad y la comparación con el óptimo de DP dependen de
+    sumas exactas. Cada evaluación es un producto punto.
+    """
+
+    __slots__ = ("weights", "values", "quantities", "max_weight", "n_items", "solution_dtype")
+
+    def __init__(self, weights, values, quantities, max_weight):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        quantities = np.asarray(quantities)
+        max_quantity = int(quantities.max()) if quantities.size else 0
+        self.solution_dtype = np.min_scalar_type(max_quantity)
+        self.quantities = np.ascontiguousarray(quantities, dtype=self.solution_dtype)
+        self.max_weight = max_weight
+        self.n_items = len(self.weights)
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Acepta un KnapsackProblem o el diccionario de set_problem_data. Con "compiled"
+        (catalog.Catalog.instance) toma sus arreglos, como el resto de las tablas compiladas.
+        """
+        if isinstance(data, cls):
+            return data
+        compiled = data.get("compiled")
+        if compiled:
+            return cls(compiled["weight_array"], compiled["value_array"], compiled["quantity_array"],
+                       data["max_weight"])
+        return cls(data["weights"], data["values"], data["quantities"], data["max_weight"])
+
+    def to_data(self):
+        """Diccionario de listas para set_problem_data."""
+        return {
+            "weights": self.weights.tolist(),
+            "values": self.values.tolist(),
+            "quantities": self.quantities.tolist(),
+            "max_weight": self.max_weight,
+            "n_items": self.n_items,
+        }
+
+    def solution(self, quantities=None):
+        """Solución compacta: copia de quantities (o ceros) con el dtype de las cantidades."""
+        if quantities is None:
+            return np.zeros(self.n_items, dtype=self.solution_dtype)
+        return np.array(quantities, dtype=self.solution_dtype)
+
+    def value(self, solution):
+        return float(np.dot(solution, self.values))
+
+    def weight(self, solution):
+        return float(np.dot(solution, self.weights))
+
+    def evaluate(self, solution):
+        solution = np.asarray(solution)
+        return self.value(solution), self.weight(solution)
+
+    def is_feasible(self, solution):
+        return self.weight(solution) <= self.max_weight
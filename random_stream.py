@@ -0,0 +1,79 @@
+import operator
+import numpy as np
+
+
+def generator_from_state(state):
+    """numpy.random.Generator con el estado de bit_generator.state (p. ej. leído de JSON)."""
+    generator = np.random.Generator(getattr(np.random, state["bit_generator"])())
+    generator.bit_generator.state = state
+    return generator
+
+
+class RandomStream:
+    """
+    Fuente de números aleatorios reproducible para los solvers.
+    Envuelve un numpy.random.Generator y entrega los uniformes escalares desde bloques
+    pregenerados, de modo que los bucles en Python no llaman al generador en cada sorteo.
+    """
+
+    def __init__(self, seed=None, block_size=4096):
+        # Acepta una semilla entera, None o un Generator ya construido
+        self.generator = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.block_size = block_size
+        self._start_stream()
+
+    def _start_stream(self, block_state=None, offset=0):
+        # Bloque en curso y estado del generador antes de producirlo (para get_state)
+        self._block_state = block_state
+        self._block = iter(())
+        if block_state is not None:
+            self._block = iter(generator_from_state(block_state).random(self.block_size).tolist()[offset:])
+        self._stream = self._blocks()
+        # __next__ de un generador es una llamada en C: más barata que un método Python
+        self.random = self._stream.__next__
+
+    def _blocks(self):
+        yield from self._block
+        while True:
+            self._block_state = self.generator.bit_generator.state
+            self._block = iter(self.generator.random(self.block_size).tolist())
+            yield from self._block
+
+    def get_state(self):
+        """
+        Posición exacta del flujo, serializable como JSON: estado del generador y, si el bloque
+        en curso no se agotó, el estado con que se generó y cuántos números ya se consumieron.
+        """
+        state = {"generator": self.generator.bit_generator.state, "block_size": self.block_size,
+                 "block": None, "offset": 0}
+        remaining = operator.length_hint(self._block)
+        if remaining:
+            state["block"] = self._block_state
+            state["offset"] = self.block_size - remaining
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """RandomStream que continúa exactamente donde estaba el de get_state."""
+        stream = cls(generator_from_state(state["generator"]), state["block_size"])
+        stream._start_stream(state["block"], state["offset"])
+        return stream
+
+    def __getstate__(self):
+        # Los generadores de Python no se pueden serializar; se reconstruye el flujo al cargar
+        return {"generator": self.generator, "block_size": self.block_size}
+
+    def __setstate__(self, state):
+        self.generator = state["generator"]
+        self.block_size = state["block_size"]
+        self._start_stream()
+
+    def randint(self, a, b):
+        """Entero uniforme en [a, b], ambos incluidos (como random.randint)."""
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def permutation(self, n):
+        return self.generator.permutation(n).tolist()
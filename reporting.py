@@ -0,0 +1,104 @@
+import statistics
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+
+def headless_pyplot():
+    """Importa pyplot con el backend Agg (sin ventanas); solo se llama al renderizar."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def draw_convergence(plt, iterations, history, title, style, ylabel):
+    fig = plt.figure(figsize=(10, 6))
+    plt.plot(iterations, history, style)
+    plt.title(title)
+    plt.xlabel('Iteración')
+    plt.ylabel(ylabel)
+    plt.grid(True)
+    return fig
+
+
+def draw_performance(plt, iterations, history, values, title, style, ylabel):
+    """Convergencia de la última ejecución y barras del valor de cada ejecución."""
+    n = len(values)
+    promedio = statistics.mean(values)
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+
+    # Gráfico de convergencia de la última ejecución
+    ax1.plot(iterations, history, style)
+    ax1.set_title(title)
+    ax1.set_xlabel('Iteración')
+    ax1.set_ylabel(ylabel)
+    ax1.grid(True)
+
+    # Gráfico de barras para todas las ejecuciones
+    x = np.arange(n)
+    ax2.bar(x, values, color='blue', alpha=0.7)
+    ax2.axhline(y=promedio, color='r', linestyle='-', label=f'Promedio: {promedio:.2f}')
+    ax2.set_title(f'Desempeño en {n} ejecuciones')
+    ax2.set_xlabel('Ejecuciones')
+    ax2.set_ylabel('Costo Total')
+    ax2.legend()
+    ax2.grid(True, axis='y')
+
+    plt.tight_layout()
+    return fig
+
+
+DRAWERS = {
+    "convergence": draw_convergence,
+    "performance": draw_performance,
+}
+
+
+def render_figures(specs):
+    """Dibuja y guarda cada figura descrita en specs con Agg; devuelve las rutas escritas."""
+    plt = headless_pyplot()
+    paths = []
+    for spec in specs:
+        spec = dict(spec)
+        kind = spec.pop("kind")
+        path = spec.pop("path")
+        fig = DRAWERS[kind](plt, **spec)
+        fig.savefig(path)
+        plt.close(fig)
+        paths.append(path)
+    return paths
+
+
+class StudyReport:
+    """
+    Acumula las figuras de un estudio mientras se ejecutan los solvers y las genera todas
+    juntas al final (render) o en un proceso aparte (render_in_background), sin bloquear
+    el cálculo ni importar matplotlib hasta entonces.
+    """
+
+    def __init__(self):
+        self.specs = []
+
+    def add_convergence(self, path, history, title, style='b-', ylabel='Valor de la mochila'):
+        iterations, values = history.points()
+        self.specs.append({"kind": "convergence", "path": path, "iterations": iterations.copy(),
+                           "history": values.copy(), "title": title, "style": style, "ylabel": ylabel})
+
+    def add_performance(self, path, history, values, title, style='b-', ylabel='Valor de la mochila'):
+        iterations, history_values = history.points()
+        self.specs.append({"kind": "performance", "path": path, "iterations": iterations.copy(),
+                           "history": history_values.copy(), "values": list(values), "title": title,
+                           "style": style, "ylabel": ylabel})
+
+    def render(self):
+        paths = render_figures(self.specs)
+        self.specs = []
+        return paths
+
+    def render_in_background(self):
+        """Genera las figuras en otro proceso; devuelve un Future con las rutas."""
+        pool = ProcessPoolExecutor(max_workers=1)
+        future = pool.submit(render_figures, self.specs)
+        pool.shutdown(wait=False)
+        self.specs = []
+        return future
@@ -0,0 +1,322 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from stopping import StoppingCriteria
+from excel_reader import load_data
+from solvers import SOLVERS, build_solver, sembrar
+
+# Estados de un trabajo
+PENDIENTE = "pendiente"
+EJECUTANDO = "ejecutando"
+TERMINADO = "terminado"
+CANCELADO = "cancelado"
+VENCIDO = "vencido"
+ERROR = "error"
+FINALES = (TERMINADO, CANCELADO, VENCIDO, ERROR)
+
+# Segundos extra sobre el plazo antes de abandonar un trabajo que no se detuvo solo (p. ej. DP)
+GRACIA_PLAZO = 1.0
+# Segundos que se conserva un trabajo terminado para consultar su estado o resultado
+RETENCION = 600.0
+
+
+class JobControl(StoppingCriteria):
+    """
+    Criterios de parada de un trabajo del servicio. Además de los de StoppingCriteria publica el
+    mejor valor en la cola de progreso y revisa si el trabajo fue cancelado ("cancelled"), ambas
+    cosas como mucho cada report_every segundos para no pagar la comunicación en cada iteración.
+    """
+
+    def __init__(self, job_id, cancelled, updates, report_every=0.2, **criteria):
+        super().__init__(**criteria)
+        self.job_id = job_id
+        self.cancelled = cancelled
+        self.updates = updates
+        self.report_every = report_every
+
+    def start(self):
+        super().start()
+        self.last_report = time.perf_counter()
+        self.reported_value = None
+
+    def check(self, iteration, best_value):
+        reason = super().check(iteration, best_value)
+        if reason:
+            return reason
+        now = time.perf_counter()
+        if now - self.last_report < self.report_every:
+            return None
+        self.last_report = now
+        if best_value != self.reported_value:
+            self.reported_value = best_value
+            self.updates.put((self.job_id, "progreso", {"iteracion": iteration, "mejor_valor": best_value}))
+        if self.job_id in self.cancelled:
+            return "cancelled"
+        return None
+
+
+def _calentar():
+    return os.getpid()
+
+
+def _ejecutar_trabajo(job_id, instancia, algoritmo, params, semilla, limite, cancelled, updates, report_every):
+    updates.put((job_id, "inicio", {"pid": os.getpid()}))
+    with contextlib.redirect_stdout(sys.stderr):
+        if "ruta" in instancia:
+            data = load_data(instancia["ruta"], instancia.get("capacidad"), interactive=False)
+            if data is None:
+                raise ValueError(f"No se pudo cargar {instancia['ruta']}")
+        else:
+            data = instancia
+
+        params = dict(params or {})
+        criteria = dict(params.pop("stopping", None) or {})
+        solver = build_solver(algoritmo, params)
+        if hasattr(solver, "stopping"):
+            if limite is not None:
+                restante = max(limite - time.time(), 0.0)
+                criteria["time_limit"] = min(criteria.get("time_limit") or restante, restante)
+            solver.stopping = JobControl(job_id, cancelled, updates, report_every, **criteria)
+        solver.set_problem_data(data)
+        sembrar(solver, semilla)
+        start = time.perf_counter()
+        sol, valor, iter_conv, _ = solver.run()
+        tiempo = time.perf_counter() - start
+        if sol is None:
+            # Ninguna solución con valor positivo (p. ej. ningún ítem cabe): mochila vacía
+            sol = solver.problem.solution()
+
+    return {
+        "valor": valor,
+        "peso": solver.calculate_weight(sol),
+        "iter_convergencia": iter_conv,
+        "iteraciones": solver.iterations,
+        "parada": solver.stop_reason,
+        "tiempo": tiempo,
+        "solucion": [int(q) for q in sol],
+    }
+
+
+class Job:
+    def __init__(self, job_id, algoritmo, deadline):
+        self.id = job_id
+        self.algoritmo = algoritmo
+        self.deadline = deadline
+        self.estado = PENDIENTE
+        self.progreso = None
+        self.resultado = None
+        self.error = None
+        self.future = None
+        self.task = None
+        self.watchers = []
+
+    def status(self):
+        return {"job": self.id, "algoritmo": self.algoritmo, "estado": self.estado, "progreso": self.progreso,
+                "resultado": self.resultado, "error": self.error}
+
+
+class SolverService:
+    """
+    Servicio asíncrono de trabajos de mochila sobre un pool de procesos ya arrancados.
+    Cada trabajo es una instancia (diccionario de set_problem_data o {"ruta": xlsx, "capacidad": ...}),
+    un algoritmo de solvers.SOLVERS y sus parámetros. deadline (segundos desde el envío) se traduce en
+    time_limit para SA/ACO, que devuelven su mejor solución al vencer; cancel() detiene el trabajo
+    en la siguiente revisión y progress() entrega el mejor valor parcial a medida que mejora.
+    Los trabajos terminados se descartan retencion segundos después; luego status(), cancel() y
+    result() con su identificador lanzan KeyError.
+    """
+
+    def __init__(self, procesos=None, report_every=0.2, retencion=RETENCION):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.report_every = report_every
+        self.retencion = retencion
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.pool = None
+        self.manager = None
+        self.cancelled = None
+        self.updates = None
+        self.reader = None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.manager = multiprocessing.Manager()
+        self.cancelled = self.manager.dict()
+        self.updates = self.manager.Queue()
+        self.pool = ProcessPoolExecutor(max_workers=self.procesos)
+        # Arranca todos los procesos ahora y no con el primer trabajo
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _calentar) for _ in range(self.procesos)))
+        self.reader = asyncio.create_task(self._leer_progreso())
+        return self
+
+    async def close(self):
+        for job in self.jobs.values():
+            if job.estado not in FINALES:
+                self.cancel(job.id)
+        tasks = [job.task for job in self.jobs.values() if job.task]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.updates.put(None)
+        await self.reader
+        self.pool.shutdown(wait=True)
+        self.manager.shutdown()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def submit(self, instancia, algoritmo="aco", params=None, semilla=None, deadline=None):
+        """Encola un trabajo y devuelve su identificador."""
+        if algoritmo not in SOLVERS:
+            raise ValueError(f"Algoritmo desconocido: {algoritmo}")
+        job = Job(next(self.ids), algoritmo, deadline)
+        self.jobs[job.id] = job
+        limite = None if deadline is None else time.time() + deadline
+        job.future = self.pool.submit(_ejecutar_trabajo, job.id, instancia, algoritmo, params, semilla, limite,
+                                      self.cancelled, self.updates, self.report_every)
+        job.task = asyncio.create_task(self._esperar(job))
+        return job.id
+
+    async def _esperar(self, job):
+        try:
+            timeout = None if job.deadline is None else job.deadline + GRACIA_PLAZO
+            job.resultado = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+            job.estado = CANCELADO if job.resultado["parada"] == "cancelled" else TERMINADO
+        except asyncio.TimeoutError:
+            # El solver no respetó el plazo: se abandona su resultado
+            self.cancelled[job.id] = True
+            job.future.cancel()
+            job.estado = VENCIDO
+        except asyncio.CancelledError:
+            job.estado = CANCELADO
+        except Exception as e:
+            job.estado = ERROR
+            job.error = str(e)
+        self._notificar(job)
+        self._olvidar(job)
+
+    def _olvidar(self, job):
+        # La marca de cancelación solo sirve mientras un proceso sigue con el trabajo (un trabajo
+        # vencido puede seguir corriendo); el trabajo se descarta pasada la retención
+        job.future.add_done_callback(lambda _: self.cancelled.pop(job.id, None))
+        asyncio.get_running_loop().call_later(self.retencion, self.jobs.pop, job.id, None)
+
+    async def _leer_progreso(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            mensaje = await loop.run_in_executor(None, self.updates.get)
+            if mensaje is None:
+                return
+            job_id, tipo, datos = mensaje
+            job = self.jobs.get(job_id)
+            if job is None or job.estado in FINALES:
+                continue
+            if tipo == "inicio":
+                job.estado = EJECUTANDO
+            else:
+                job.progreso = datos
+            self._notificar(job)
+
+    def _notificar(self, job):
+        for watcher in job.watchers:
+            watcher.put_nowait(job.status())
+
+    def status(self, job_id):
+        return self.jobs[job_id].status()
+
+    def cancel(self, job_id):
+        """Cancela un trabajo pendiente o en ejecución; devuelve False si ya había terminado."""
+        job = self.jobs[job_id]
+        if job.estado in FINALES:
+            return False
+        self.cancelled[job_id] = True
+        # Si aún no había empezado no llegará a ejecutarse; si no, el solver se detiene en su próxima revisión
+        job.future.cancel()
+        return True
+
+    async def result(self, job_id):
+        job = self.jobs[job_id]
+        await asyncio.gather(job.task, return_exceptions=True)
+        return job.status()
+
+    async def progress(self, job_id):
+        """Generador asíncrono de estados del trabajo; termina con el estado final."""
+        job = self.jobs[job_id]
+        watcher = asyncio.Queue()
+        job.watchers.append(watcher)
+        try:
+            yield job.status()
+            while job.estado not in FINALES:
+                yield await watcher.get()
+        finally:
+            job.watchers.remove(watcher)
+
+
+async def _atender(service, reader, writer):
+    """Protocolo de líneas JSON: cada petición lleva "op" (submit, status, cancel, result, watch)."""
+    async def enviar(obj):
+        writer.write((json.dumps(obj) + "\n").encode())
+        await writer.drain()
+
+    try:
+        while line := await reader.readline():
+            try:
+                req = json.loads(line)
+                op = req.get("op")
+                if op == "submit":
+                    job_id = await service.submit(req["instancia"], req.get("algoritmo", "aco"), req.get("params"),
+                                                  req.get("semilla"), req.get("deadline"))
+                    await enviar({"job": job_id})
+                elif op == "status":
+                    await enviar(service.status(req["job"]))
+                elif op == "cancel":
+                    await enviar({"job": req["job"], "cancelado": service.cancel(req["job"])})
+                elif op == "result":
+                    await enviar(await service.result(req["job"]))
+                elif op == "watch":
+                    async for estado in service.progress(req["job"]):
+                        await enviar(estado)
+                else:
+                    await enviar({"error": f"Operación desconocida: {op}"})
+            except (KeyError, ValueError, TypeError) as e:
+                await enviar({"error": repr(e)})
+    finally:
+        writer.close()
+
+
+async def serve_unix(service, path):
+    """Atiende el servicio en un socket Unix; devuelve el asyncio.Server."""
+    if os.path.exists(path):
+        os.remove(path)
+    return await asyncio.start_unix_server(lambda r, w: _atender(service, r, w), path)
+
+
+async def _servir(args):
+    async with SolverService(args.procesos) as service:
+        server = await serve_unix(service, args.socket)
+        print(f"Servicio escuchando en {args.socket} con {service.procesos} procesos", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio de trabajos de mochila sobre un socket Unix.")
+    parser.add_argument("--socket", default="/tmp/mochila.sock", help="Ruta del socket Unix")
+    parser.add_argument("-p", "--procesos", type=int, help="Procesos del pool (por defecto, todos los núcleos)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_servir(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import json
+from SimulatedAnnealing import KnapsackSimulatedAnnealing
+from AntColony import KnapsackAntColony
+from DynamicProgramming import KnapsackDynamicProgramming
+from stopping import StoppingCriteria
+from local_search import LocalSearch
+
+# Algoritmos disponibles y sus parámetros por defecto
+SOLVERS = {
+    "sa": KnapsackSimulatedAnnealing,
+    "aco": KnapsackAntColony,
+    "dp": KnapsackDynamicProgramming,
+}
+DEFAULT_PARAMS = {
+    "sa": {"initial_temp": 1000, "final_temp": 1, "cooling_rate": 0.95, "max_iterations": 1000},
+    "aco": {"ant_count": 50, "max_iterations": 200, "alpha": 1.0, "beta": 2.0, "evaporation_rate": 0.5, "q": 100},
+    "dp": {},
+}
+
+# Estado que cada proceso de un pool recibe una sola vez al arrancar (ver iniciar_worker)
+worker_state = {}
+
+
+def build_solver(algoritmo, params):
+    """
+    Crea el solver; params["stopping"] y params["local_search"] pueden ser diccionarios
+    con los argumentos de StoppingCriteria y LocalSearch.
+    """
+    params = dict(params)
+    if isinstance(params.get("stopping"), dict):
+        params["stopping"] = StoppingCriteria(**params["stopping"])
+    if isinstance(params.get("local_search"), dict):
+        params["local_search"] = LocalSearch(**params["local_search"])
+    return SOLVERS[algoritmo](**params)
+
+
+def load_configs(config=None, algoritmos=("sa", "aco")):
+    """
+    Lista de (algoritmo, parámetros): las de un JSON [{"algoritmo": "sa", "params": {...}}, ...]
+    completadas con DEFAULT_PARAMS o, sin config, los parámetros por defecto de cada algoritmo.
+    """
+    if not config:
+        return [(alg, DEFAULT_PARAMS[alg]) for alg in algoritmos]
+    with open(config, encoding="utf-8") as f:
+        configs = json.load(f)
+    result = []
+    for c in configs:
+        if c["algoritmo"] not in SOLVERS:
+            raise ValueError(f"Algoritmo desconocido en {config}: {c['algoritmo']}")
+        result.append((c["algoritmo"], {**DEFAULT_PARAMS[c["algoritmo"]], **c.get("params", {})}))
+    return result
+
+
+def sembrar(solver, semilla):
+    """Fija la semilla del solver (no hace nada si es None)."""
+    if semilla is not None:
+        solver.set_seed(semilla)
+
+
+def iniciar_worker(estado):
+    """Initializer de ProcessPoolExecutor: deja el diccionario estado en worker_state."""
+    worker_state.clear()
+    worker_state.update(estado)
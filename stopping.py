@@ -0,0 +1,54 @@
+import time
+from collections import deque
+
+
+class StoppingCriteria:
+    """
+    Criterios de parada anticipada compartidos por los solvers.
+    Cualquier combinación es válida; el primero que se cumple detiene run() y su nombre
+    queda en solver.stop_reason:
+    - max_stagnation: iteraciones seguidas sin mejorar el mejor valor ("stagnation")
+    - time_limit: segundos de reloj desde el inicio de run() ("time_limit")
+    - target_value: valor objetivo, p. ej. el óptimo de DP ("target_value")
+    - min_improvement: mejora relativa mínima en las últimas `window` iteraciones ("min_improvement")
+    """
+
+    def __init__(self, max_stagnation=None, time_limit=None, target_value=None, min_improvement=None, window=50):
+        self.max_stagnation = max_stagnation
+        self.time_limit = time_limit
+        self.target_value = target_value
+        self.min_improvement = min_improvement
+        self.window = window
+        self.start()
+
+    def start(self):
+        """Reinicia el estado; los solvers lo llaman al comenzar run()."""
+        self.deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        self.best_value = None
+        self.stagnant = 0
+        self.recent = deque(maxlen=self.window + 1)
+
+    def check(self, iteration, best_value):
+        """
+        Registra el mejor valor tras `iteration` iteraciones completadas (la misma cuenta en todos
+        los solvers) y devuelve el criterio cumplido o None.
+        """
+        if self.best_value is None or best_value > self.best_value:
+            self.best_value = best_value
+            self.stagnant = 0
+        else:
+            self.stagnant += 1
+
+        if self.target_value is not None and best_value >= self.target_value:
+            return "target_value"
+        if self.max_stagnation is not None and self.stagnant >= self.max_stagnation:
+            return "stagnation"
+        if self.min_improvement is not None:
+            self.recent.append(best_value)
+            if len(self.recent) == self.recent.maxlen:
+                old = self.recent[0]
+                if old > 0 and (best_value - old) / old < self.min_improvement:
+                    return "min_improvement"
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return "time_limit"
+        return None
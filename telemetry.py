@@ -0,0 +1,127 @@
+import os
+import numpy as np
+
+# Registro binario de telemetría: ejecución, iteración y mejor valor
+RECORD_DTYPE = np.dtype([("run", "<u4"), ("iteration", "<u4"), ("value", "<f8")])
+
+
+class ConvergenceTrace:
+    """
+    Historial de convergencia con memoria constante.
+    Guarda hasta `capacity` puntos en arreglos preasignados; al llenarse descarta uno de
+    cada dos y duplica el paso de muestreo, así que cubre ejecuciones de cualquier longitud.
+    El punto más reciente siempre se conserva (en una ranura final provisional si no cae en
+    el paso), de modo que la traza termina en el último valor de la ejecución.
+    Se usa como una lista de valores (append, len, índices, iteración) y con np.asarray.
+    """
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        # Una ranura extra para el punto provisional
+        self.iterations = np.empty(capacity + 1, dtype=np.int64)
+        self.values = np.empty(capacity + 1)
+        self.size = 0
+        self.tail = False
+        self.stride = 1
+        self.count = 0
+
+    def append(self, value):
+        if self.count % self.stride == 0 and self.size == self.capacity:
+            # Submuestreo in situ: conserva los puntos de índice par
+            half = (self.size + 1) // 2
+            self.iterations[:half] = self.iterations[:self.size:2]
+            self.values[:half] = self.values[:self.size:2]
+            self.size = half
+            self.stride *= 2
+        # Los puntos fuera del paso ocupan la ranura provisional, que el siguiente reemplaza
+        self.iterations[self.size] = self.count
+        self.values[self.size] = value
+        self.tail = self.count % self.stride != 0
+        if not self.tail:
+            self.size += 1
+        self.count += 1
+
+    def points(self):
+        """(iteraciones, valores) de los puntos guardados, como vistas sin copia."""
+        end = self.size + self.tail
+        return self.iterations[:end], self.values[:end]
+
+    def __len__(self):
+        return self.size + self.tail
+
+    def __getitem__(self, index):
+        return self.points()[1][index]
+
+    def __iter__(self):
+        return iter(self.points()[1].tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.points()[1], dtype=dtype)
+
+
+class TelemetryWriter:
+    """
+    Sumidero de trazas de convergencia de todas las ejecuciones.
+    Acumula registros en un buffer preasignado y los vuelca al archivo (append) cada
+    `flush_every` registros y al terminar cada ejecución. format="binary" escribe registros
+    RECORD_DTYPE; format="csv" escribe líneas run,iteration,value. stride guarda una de cada
+    `stride` iteraciones. La ruta puede contener {pid} para usar un archivo por proceso.
+    """
+
+    def __init__(self, path, format="binary", stride=1, flush_every=4096):
+        if format not in ("binary", "csv"):
+            raise ValueError(f"Formato de telemetría desconocido: {format}")
+        self.path = path
+        self.format = format
+        self.stride = stride
+        self.buffer = np.empty(flush_every, dtype=RECORD_DTYPE)
+        self.size = 0
+        self.run = -1
+
+    def __getstate__(self):
+        # Cada proceso parte con el buffer vacío
+        state = self.__dict__.copy()
+        state["size"] = 0
+        return state
+
+    def begin_run(self):
+        self.run += 1
+        return self.run
+
+    def record(self, iteration, value):
+        if iteration % self.stride:
+            return
+        if self.size == len(self.buffer):
+            self.flush()
+        self.buffer[self.size] = (self.run, iteration, value)
+        self.size += 1
+
+    def end_run(self):
+        self.flush()
+
+    def flush(self):
+        if not self.size:
+            return
+        path = self.path.format(pid=os.getpid())
+        records = self.buffer[:self.size]
+        if self.format == "binary":
+            with open(path, "ab") as f:
+                records.tofile(f)
+        else:
+            new_file = not os.path.exists(path)
+            with open(path, "a", encoding="utf-8") as f:
+                if new_file:
+                    f.write("run,iteration,value\n")
+                np.savetxt(f, np.column_stack([records["run"], records["iteration"], records["value"]]),
+                           fmt=["%d", "%d", "%.17g"], delimiter=",")
+        self.size = 0
+
+
+def load_telemetry(path):
+    """Lee un archivo de telemetría (binario o CSV) como arreglo estructurado RECORD_DTYPE."""
+    if path.endswith(".csv"):
+        data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+        records = np.empty(len(data), dtype=RECORD_DTYPE)
+        records["run"], records["iteration"], records["value"] = data[:, 0], data[:, 1], data[:, 2]
+        return records
+    return np.fromfile(path, dtype=RECORD_DTYPE)